@@ -0,0 +1,64 @@
+"""XML->CSV re-export times with the row cache: cold, unchanged, 1% edited.
+
+    python benchmarks/cache.py [-n FILES] [--workers N]
+
+Writes a synthetic corpus into a temporary directory and checks every
+cached export against an uncached one.
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from isa import xml2csv as x2c
+from isa.cache import cache_path, RowCache
+
+from corpus import write_mods_corpus
+
+
+def export(xml_dir, output, workers, cache=True):
+    start = time.perf_counter()
+    paths = x2c.xml_paths(xml_dir)
+    if cache:
+        row_cache = RowCache(cache_path(output))
+        x2c.write_csv(x2c.iter_rows_cached(paths, row_cache, workers=workers), output)
+        row_cache.close()
+    else:
+        x2c.write_csv(x2c.iter_rows(x2c.iter_xml(xml_dir)), output)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--files", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_dir = Path(tmp, "xml")
+        xml_dir.mkdir()
+        write_mods_corpus(xml_dir, args.files, compound_every=40)
+        output = Path(tmp, "out.csv")
+        expected = Path(tmp, "expected.csv")
+
+        uncached = export(xml_dir, expected, args.workers, cache=False)
+        cold = export(xml_dir, output, args.workers)
+        warm = export(xml_dir, output, args.workers)
+        same = output.read_bytes() == expected.read_bytes()
+
+        for x in sorted(xml_dir.iterdir())[::100]:
+            x.write_bytes(x.read_bytes().replace(b"Ames, Iowa", b"Boone, Iowa"))
+        edited = export(xml_dir, output, args.workers)
+        export(xml_dir, expected, args.workers, cache=False)
+        same = same and output.read_bytes() == expected.read_bytes()
+
+    print(f"files:           {args.files}")
+    print(f"no cache:        {uncached:8.2f}s")
+    print(f"cold cache:      {cold:8.2f}s")
+    print(f"unchanged:       {warm:8.2f}s")
+    print(f"1% edited:       {edited:8.2f}s")
+    print(f"matches uncached: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Synthetic MODS records, and the matching CSV rows, for benchmarking.
+
+    python benchmarks/corpus.py DIRECTORY [-n RECORDS] [--shard N] [--csv FILE]
+"""
+import argparse
+import csv
+from pathlib import Path
+import random
+
+from lxml import etree
+from lxml.builder import ElementMaker
+
+from isa import xml2csv as x2c
+
+MODS_NS = "http://www.loc.gov/mods/v3"
+M = ElementMaker(namespace=MODS_NS, nsmap={None: MODS_NS})
+
+WORDS = (
+    "agriculture campus engineering extension farm football history iowa "
+    "lecture livestock music photograph poultry research science students "
+    "veterinary women ames cyclone library archives"
+).split()
+
+
+def _words(rng, n=3):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def _uri(rng, kind="names"):
+    return f"http://id.loc.gov/authorities/{kind}/n{rng.randrange(10**8)}"
+
+
+def _maybe(rng, p=0.5):
+    return rng.random() < p
+
+
+def _attrs(rng, uri_kind="names", **attrs):
+    if _maybe(rng, 0.7):
+        attrs["valueURI"] = _uri(rng, uri_kind)
+    return attrs
+
+
+def _name(rng, kind, roles, parts=1):
+    name = M.name(type=kind, authority="naf", **_attrs(rng))
+    for _ in range(parts):
+        name.append(M.namePart(_words(rng, 2)))
+    for role in roles:
+        name.append(M.role(M.roleTerm(role, type="text", authority="marcrelator")))
+    if _maybe(rng, 0.1):
+        # A namePart after the role has no following-sibling role.
+        name.append(M.namePart(_words(rng, 1)))
+    return name
+
+
+def _subject(rng, authority, kind):
+    subject = M.subject()
+    if authority is not None:
+        subject.set("authority", authority)
+    for _ in range(rng.randint(1, 3)):
+        if kind == "name":
+            subject.append(
+                M.name(
+                    M.namePart(_words(rng, 2)),
+                    type=rng.choice(["personal", "corporate"]),
+                    **_attrs(rng),
+                )
+            )
+        elif kind == "geographic":
+            geographic = M.geographic(_words(rng, 1), **_attrs(rng, "subjects"))
+            if _maybe(rng, 0.3):
+                geographic.append(
+                    M.cartographics(M.coordinates(f"{rng.uniform(-90, 90):.4f}"))
+                )
+                geographic.append(M.coordinates(f"{rng.uniform(-90, 90):.4f}"))
+            subject.append(geographic)
+        else:
+            subject.append(getattr(M, kind)(_words(rng, 2), **_attrs(rng, "subjects")))
+    return subject
+
+
+def mods_record(i, rng=None, compound=None):
+    """Return a <mods> element exercising every column XmlMD knows.
+
+    ``compound`` is a (local_id, page) pair; page 0 is the parent object and
+    has no file name, later pages carry ``{local_id}_{page}.tif``.
+    """
+    rng = rng or random.Random(i)
+    mods = M.mods(version="3.8")
+
+    mods.append(M.titleInfo(M.title(_words(rng, 5))))
+    if compound is not None and compound[1]:
+        mods[0][0].text = rng.choice(["Page", "Front cover", "Back cover"])
+        mods[0][0].text += f" {compound[1]}"
+
+    if _maybe(rng, 0.8):
+        original = M.relatedItem(type="original", displayLabel="Collection")
+        original.append(
+            M.identifier(f"RS {i % 20}/{i % 7}/{i % 50}", displayLabel="Call Number")
+        )
+        original.append(M.titleInfo(M.title(_words(rng, 4))))
+        original.append(M.identifier(f"https://n2t.net/ark:/87292/w9{i:x}", type="ark"))
+        original.append(M.location(M.physicalLocation(_words(rng, 2))))
+        if _maybe(rng):
+            original.append(
+                M.relatedItem(
+                    M.titleInfo(M.title(_words(rng, 3))),
+                    M.relatedItem(
+                        M.titleInfo(M.title(_words(rng, 2))), type="constituent"
+                    ),
+                    type="series",
+                )
+            )
+        if _maybe(rng):
+            original.append(
+                M.relatedItem(
+                    M.titleInfo(M.title(f"Box {i % 40}")),
+                    M.relatedItem(
+                        M.titleInfo(M.title(f"Folder {i % 9}")), type="constituent"
+                    ),
+                    type="constituent",
+                )
+            )
+        mods.append(original)
+    mods.append(
+        M.relatedItem(
+            M.titleInfo(M.title(_words(rng, 3))),
+            M.identifier(f"https://n2t.net/ark:/87292/w9c{i % 13}", type="ark"),
+            type="host",
+        )
+    )
+    if _maybe(rng, 0.2):
+        mods.append(
+            M.relatedItem(
+                M.titleInfo(M.title(_words(rng, 3))),
+                M.identifier(f"https://exhibits.example.edu/{i}"),
+                type="isReferencedBy",
+            )
+        )
+
+    mods.append(_name(rng, "corporate", ["curator"]))
+    roles = ["creator", "interviewee", "interviewer", "contributor"]
+    for _ in range(rng.randint(1, 6)):
+        kind = rng.choice(["personal", "corporate"])
+        picked = rng.sample(roles, rng.choice([1, 1, 1, 2]))
+        mods.append(_name(rng, kind, picked, rng.choice([1, 1, 2])))
+
+    mods.append(M.abstract(_words(rng, 30)))
+    if _maybe(rng, 0.2):
+        mods.append(M.tableOfContents(_words(rng, 10)))
+    for note_type in ("annotation", "hardware/software", "Disclaimer"):
+        if _maybe(rng, 0.3):
+            mods.append(M.note(_words(rng, 6), type=note_type))
+    if _maybe(rng, 0.1):
+        # Mixed content: a comment splits the text into two text() nodes.
+        note = M.note("Before ", type="annotation")
+        note.append(etree.Comment("internal"))
+        note[-1].tail = " after"
+        mods.append(note)
+    mods.append(M.location(M.url(f"https://digitalcollections.example.edu/{i}")))
+    for code in rng.sample(["eng", "spa", "ger", "fre"], rng.randint(1, 2)):
+        mods.append(M.language(M.languageTerm(code, type="code", authority="iso639-3")))
+
+    for authority, kind in (
+        ("lcsh", "topic"),
+        ("fast", "topic"),
+        ("local", "topic"),
+        ("gbif", "topic"),
+        ("lcsh", "geographic"),
+        ("fast", "geographic"),
+        ("local", "geographic"),
+        ("geonames", "geographic"),
+        ("naf", "name"),
+        (None, "topic"),
+        (None, "temporal"),
+        ("tgn", "geographic"),
+    ):
+        if _maybe(rng, 0.4):
+            mods.append(_subject(rng, authority, kind))
+
+    mods.append(M.genre("photographs", authority="aat", **_attrs(rng, "aat")))
+    if _maybe(rng):
+        mods.append(
+            M.genre("still images", authority="aat", type="genre", **_attrs(rng, "aat"))
+        )
+    mods.append(M.genre("StillImage", authority="dct", **_attrs(rng, "dct")))
+    mods.append(M.genre("image/jp2", authority="imt"))
+    if _maybe(rng, 0.2):
+        mods.append(M.genre(_words(rng, 2), authority="cco"))
+    mods.append(
+        M.typeOfResource(rng.choice(["still image", "text", "sound recording"]))
+    )
+    mods.append(M.accessCondition(_words(rng, 8), type="use and reproduction"))
+    mods.append(
+        M.accessCondition(
+            "In Copyright",
+            valueURI="http://rightsstatements.org/vocab/InC/1.0/",
+        )
+    )
+
+    origin = M.originInfo(
+        M.dateCreated(f"{1900 + i % 120}-01-01", keyDate="yes", encoding="iso8601"),
+        M.dateCaptured(f"20{i % 24:02d}-05-01", encoding="iso8601"),
+        M.place(M.placeTerm("Ames, Iowa", type="text")),
+    )
+    if _maybe(rng, 0.3):
+        origin.append(M.publisher(_words(rng, 3), **_attrs(rng)))
+        origin.append(M.issuance("serial"))
+        origin.append(M.dateIssued("1950", point="start", encoding="iso8601"))
+        origin.append(M.dateIssued("1960", point="end", encoding="iso8601"))
+        origin.append(M.frequency("Annual", authority="marcfrequency"))
+    mods.append(origin)
+    mods.append(
+        M.recordInfo(
+            M.recordCreationDate("2020-01-01", encoding="iso8601"),
+            M.recordChangeDate("2024-01-01", encoding="iso8601"),
+        )
+    )
+
+    physical = M.physicalDescription(M.extent(f"{rng.randint(1, 400)} pages"))
+    if _maybe(rng, 0.3):
+        physical.append(M.extent("1 photograph"))
+    physical.append(M.digitalOrigin("reformatted digital"))
+    for note_type in (
+        "image-manipulation",
+        "file-size",
+        "resolution",
+        "colorspace",
+        "bits-per-sample",
+        "samples-per-pixel",
+        "height",
+        "width",
+    ):
+        if _maybe(rng, 0.6):
+            physical.append(M.note(str(rng.randint(1, 5000)), type=note_type))
+    mods.append(physical)
+
+    mods.append(M.identifier(f"https://n2t.net/ark:/87292/w9{i:06x}", type="ark"))
+    if compound is not None:
+        local_id, page = compound
+        mods.append(M.identifier(local_id, type="local"))
+        if page:
+            mods.append(M.identifier(f"{local_id}_{page}.tif"))
+    else:
+        mods.append(M.identifier(f"RS{i:06d}", type="local"))
+        mods.append(M.identifier(f"RS{i:06d}.tif"))
+    if _maybe(rng, 0.2):
+        mods.append(M.identifier(str(i), type="uid"))
+        mods.append(M.identifier(f"A{i}", type="avian-id"))
+        mods.append(M.identifier(f"P-{i % 100}", type="project-number"))
+    mods.append(M.identifier(f"isu:{i}", type="islandora"))
+
+    return mods
+
+
+def mods_records(n, seed=0, compound_every=0, pages=4):
+    """Yield ``n`` (file stem, <mods> element) pairs.
+
+    With ``compound_every`` set, every that-many records start a compound
+    object: ``pages`` page records followed by their parent record.
+    """
+    rng = random.Random(seed)
+    i = 0
+    while i < n:
+        if compound_every and i % compound_every == 0:
+            local_id = f"CMP{i:06d}"
+            for page in list(range(1, pages + 1)) + [0]:
+                if i >= n:
+                    break
+                yield f"isu_{i}", mods_record(i, rng, (local_id, page))
+                i += 1
+        else:
+            yield f"isu_{i}", mods_record(i, rng)
+            i += 1
+
+
+def csv_rows(n, seed=0, compound_every=0):
+    """Return ``n`` CSV rows (dicts keyed by HEADERS) for the same records."""
+    return [
+        dict(zip(x2c.HEADERS, x2c.XmlMD(etree.ElementTree(mods)).to_row()))
+        for _, mods in mods_records(n, seed, compound_every)
+    ]
+
+
+def write_mods_corpus(directory, n, seed=0, compound_every=0, shard=0):
+    """Write ``n`` MODS files; with ``shard``, that many per subdirectory."""
+    directory = Path(directory)
+    for i, (stem, mods) in enumerate(mods_records(n, seed, compound_every)):
+        folder = directory / f"{i // shard:05d}" if shard else directory
+        if shard and i % shard == 0:
+            folder.mkdir(exist_ok=True)
+        etree.ElementTree(mods).write(
+            str(folder / f"{stem}.xml"),
+            pretty_print=True,
+            xml_declaration=True,
+            encoding="UTF-8",
+        )
+
+
+def write_csv_corpus(path, n, seed=0, compound_every=0):
+    with open(path, "w", encoding="utf8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(x2c.HEADERS)
+        for _, mods in mods_records(n, seed, compound_every):
+            writer.writerow(x2c.XmlMD(etree.ElementTree(mods)).to_row())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("-n", "--records", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compound-every", type=int, default=40)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--csv")
+    args = parser.parse_args()
+
+    Path(args.directory).mkdir(parents=True, exist_ok=True)
+    write_mods_corpus(
+        args.directory, args.records, args.seed, args.compound_every, args.shard
+    )
+    if args.csv:
+        write_csv_corpus(args.csv, args.records, args.seed, args.compound_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""CsvRow construction and tree-building throughput.
+
+    python benchmarks/csvrow.py [CSV] [-n ROWS]
+
+Without a CSV, rows are generated from the synthetic MODS corpus.
+"""
+import argparse
+import time
+
+from isa import csv2xml as c2x
+
+from corpus import csv_rows
+
+
+def rows_per_second(func, mds):
+    start = time.perf_counter()
+    for md in mds:
+        func(md)
+    return len(mds) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("-n", "--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    mds = c2x.load_csv(args.csv) if args.csv else csv_rows(args.rows)
+
+    print(f"rows:                {len(mds)}")
+    print(f"CsvRow():            {rows_per_second(c2x.CsvRow, mds):10.1f} rows/s")
+    print(
+        "CsvRow().to_mods():  "
+        f"{rows_per_second(lambda md: c2x.CsvRow(md).to_mods(), mds):10.1f} rows/s"
+    )
+    print(
+        "CsvRow().to_dc():    "
+        f"{rows_per_second(lambda md: c2x.CsvRow(md).to_dc(), mds):10.1f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""isa diff times: a CSV exported from a corpus against that corpus, with 1% edited.
+
+    python benchmarks/diff.py [-n FILES] [--workers N] [--engine walk|xpath]
+
+Writes a synthetic corpus into a temporary directory, exports it with
+xml2csv, then edits the title of every hundredth row, drops one row and
+adds one before diffing again.
+"""
+import argparse
+import csv
+from pathlib import Path
+import tempfile
+import time
+
+from isa import diff
+from isa import xml2csv as x2c
+from isa.columns import HEADERS
+
+from corpus import write_mods_corpus
+
+
+def run(csv_path, xml_dir, engine, workers):
+    start = time.perf_counter()
+    _, counts, column_counts = diff.diff(
+        csv_path, x2c.xml_paths(xml_dir), list(HEADERS), engine, workers
+    )
+    return time.perf_counter() - start, counts, column_counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--files", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--engine", choices=x2c.ENGINES, default="walk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_dir = Path(tmp, "xml")
+        xml_dir.mkdir()
+        write_mods_corpus(xml_dir, args.files, compound_every=40)
+        exported = Path(tmp, "exported.csv")
+        x2c.write_csv(x2c.iter_rows(x2c.iter_xml(xml_dir)), exported, False)
+
+        with open(exported, encoding="utf8", newline="") as fh:
+            rows = list(csv.reader(fh))
+        title = HEADERS.index("title")
+        for row in rows[1::100]:
+            row[title] += " (edited)"
+        rows.append(["isu:new"] + rows[1][1:])
+        del rows[2]
+        edited = Path(tmp, "edited.csv")
+        with open(edited, "w", encoding="utf8", newline="") as fh:
+            csv.writer(fh).writerows(rows)
+
+        same, same_counts, _ = run(exported, xml_dir, args.engine, args.workers)
+        changed, counts, column_counts = run(edited, xml_dir, args.engine, args.workers)
+
+    print(f"files:          {args.files}")
+    print(f"unedited:       {same:8.2f}s  {dict(same_counts)}")
+    print(f"1% edited:      {changed:8.2f}s  {dict(counts)}")
+    print(f"per record:     {1000 * changed / args.files:8.3f}ms")
+    print(f"changed columns: {dict(column_counts)}")
+
+
+if __name__ == "__main__":
+    main()
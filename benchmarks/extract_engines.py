@@ -0,0 +1,47 @@
+"""Time the tree-walk engine against the XPath engine.
+
+    python benchmarks/extract_engines.py [-n RECORDS] [--seed SEED]
+
+Times both on test/test_data/test.xml and a generated corpus. That they
+give the same rows is checked by test/test_engines.py.
+"""
+import argparse
+from pathlib import Path
+import time
+
+from lxml import etree
+
+from isa import xml2csv as x2c
+
+from corpus import mods_records
+
+FIXTURE = Path(__file__).parent.parent / "test" / "test_data" / "test.xml"
+
+
+def records_per_second(engine, mds):
+    start = time.perf_counter()
+    for _, md in mds:
+        x2c.XmlMD(md, engine)
+    return len(mds) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--records", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mds = [("test.xml", etree.parse(str(FIXTURE)))]
+    # Round-trip through bytes so the trees look like parsed files.
+    mds += [
+        (stem, etree.ElementTree(etree.fromstring(etree.tostring(mods))))
+        for stem, mods in mods_records(args.records, args.seed, compound_every=50)
+    ]
+
+    print(f"records: {len(mds)}")
+    for engine in x2c.ENGINES:
+        print(f"{engine:6} {records_per_second(engine, mds):10.1f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Memory held by lists of XmlMD and CsvRow objects, measured with tracemalloc.
+
+    python benchmarks/memory.py [-n ROWS]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from lxml import etree
+
+from isa import csv2xml as c2x
+from isa import xml2csv as x2c
+
+from corpus import csv_rows, mods_records
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    # A small pool of distinct records, cycled to reach the requested size.
+    pool = [etree.ElementTree(mods) for _, mods in mods_records(500)]
+    csv_pool = csv_rows(500)
+
+    # Values are copied so every object owns its strings, as it would
+    # when reading a real collection.
+    def xml_objects():
+        return [x2c.XmlMD(pool[i % len(pool)]) for i in range(args.rows)]
+
+    def csv_objects():
+        return [
+            c2x.CsvRow({k: "".join(v) for k, v in csv_pool[i % len(csv_pool)].items()})
+            for i in range(args.rows)
+        ]
+
+    for label, build in (("XmlMD", xml_objects), ("CsvRow", csv_objects)):
+        objects, size = traced(build)
+        print(f"{label:7} x {len(objects)}: {size / 2**20:8.1f} MiB")
+        del objects
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Time both compound reorderings against the old list-slicing one.
+
+    python benchmarks/reorder.py [--sizes 10000 100000 1000000] [--legacy-max N]
+
+The previous implementation is quadratic, so it only runs for sizes up to
+--legacy-max. test/test_reorder.py checks the default ordering against it.
+"""
+import argparse
+import random
+import time
+
+from isa import xml2csv as x2c
+
+LOCAL_ID = x2c.LOCAL_ID
+FILE_NAME = x2c.FILE_NAME
+
+
+def legacy_reorder(rows):
+    last_compound = 0
+    for i, row in enumerate(rows):
+        if not (row[FILE_NAME]):
+            local_id = row[LOCAL_ID].strip()
+            parent_row = row
+            for r in rows[last_compound:i]:
+                keys = (r[LOCAL_ID].strip(), r[FILE_NAME].split(".")[0].strip())
+                if local_id in keys:
+                    rows = (
+                        rows[: rows.index(r)]
+                        + [parent_row]
+                        + rows[rows.index(r) : i]
+                        + rows[i + 1 :]
+                    )
+                    break
+
+            last_compound = i
+
+    return rows
+
+
+def compound_rows(n, seed=0, pages=(1, 12), singles=0.3):
+    # Runs of page rows (file name "<local_id>_<n>.tif") followed by their
+    # parent (no file name), mixed with single-file objects.
+    rng = random.Random(seed)
+    rows = []
+    while len(rows) < n:
+        local_id = f"RS{len(rows):07d}"
+        if rng.random() < singles:
+            rows.append(_row(len(rows), local_id, f"{local_id}.tif"))
+            continue
+        for page in range(rng.randint(*pages)):
+            rows.append(_row(len(rows), local_id, f"{local_id}_{page}.tif"))
+        rows.append(_row(len(rows), local_id, ""))
+    return rows[:n]
+
+
+def _row(i, local_id, file_name):
+    row = [""] * len(x2c.HEADERS)
+    row[0] = f"isu:{i}"
+    row[1] = f"Page {i}" if file_name else f"Object {i}"
+    row[LOCAL_ID] = local_id
+    row[FILE_NAME] = file_name
+    return row
+
+
+def timed(func, rows):
+    start = time.perf_counter()
+    result = func(rows)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        rows = compound_rows(n)
+        new, new_time = timed(x2c.reorder_compound_objects, rows)
+        _, grouped_time = timed(
+            lambda rows: x2c.reorder_compound_objects(rows, True), rows
+        )
+        line = f"{n:>9} rows  new {grouped_time:8.3f}s  index-based {new_time:8.3f}s"
+        if n <= args.legacy_max:
+            old, old_time = timed(legacy_reorder, rows)
+            if old != new:
+                raise SystemExit(f"Orderings differ at {n} rows")
+            line += f"  legacy {old_time:8.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Files/second for csv2xml.save_xml against the old serialize/re-parse path.
+
+    python benchmarks/save_xml.py [CSV] [-n ROWS]
+
+Without a CSV, rows are generated from the synthetic MODS corpus. Both
+paths write into temporary directories and every file is compared.
+"""
+import argparse
+from io import BytesIO
+from pathlib import Path
+import tempfile
+import time
+
+from lxml import etree
+
+from isa import csv2xml as c2x
+
+from corpus import csv_rows
+
+
+def legacy_save_xml(md, schema="mods", output_folder=""):
+    parser = etree.XMLParser(remove_blank_text=True)
+    file_name = (
+        f"{md.pid.split(':')[-1]}.xml"
+        if schema == "mods"
+        else f"dc-{md.pid.split(':')[-1]}.xml"
+    )
+    xml = md.to_mods() if schema == "mods" else md.to_dc()
+    output = etree.parse(
+        BytesIO(etree.tostring(xml, xml_declaration=True, encoding="UTF-8")),
+        parser,
+    )
+    with open(Path(output_folder, file_name), "w", encoding="utf8") as fh:
+        fh.write(
+            etree.tostring(
+                output,
+                pretty_print=True,
+                xml_declaration=True,
+                encoding="UTF-8",
+            ).decode("utf8")
+        )
+
+
+def files_per_second(save, mds, output_folder):
+    # CsvRow building is included: save_xml is always called on fresh rows.
+    rows = [c2x.CsvRow(md) for md in mds]
+    start = time.perf_counter()
+    for row in rows:
+        save(row, "mods", output_folder)
+        save(row, "dc", output_folder)
+    return 2 * len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("-n", "--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    mds = c2x.load_csv(args.csv) if args.csv else csv_rows(args.rows)
+
+    with tempfile.TemporaryDirectory() as old, tempfile.TemporaryDirectory() as new:
+        before = files_per_second(legacy_save_xml, mds, old)
+        after = files_per_second(c2x.save_xml, mds, new)
+
+        different = [
+            p.name
+            for p in Path(old).iterdir()
+            if p.read_bytes() != Path(new, p.name).read_bytes()
+        ]
+
+    print(f"rows:                  {len(mds)}")
+    print(f"re-parse path:         {before:10.1f} files/s")
+    print(f"single serialization:  {after:10.1f} files/s")
+    print(f"byte-different files:  {len(different)}")
+
+
+if __name__ == "__main__":
+    main()
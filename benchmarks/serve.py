@@ -0,0 +1,181 @@
+"""isa serve latency and throughput against running isa once per record.
+
+    python benchmarks/serve.py [-n RECORDS] [--batch N] [--clients N]
+
+Starts the server in this process on a free port (and on a Unix socket),
+checks its answers match XmlMD and CsvRow, then times single and batch
+requests over keep-alive connections.
+"""
+import argparse
+import http.client
+import json
+import os
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from lxml import etree
+
+from isa import csv2xml as c2x
+from isa import serve
+from isa import xml2csv as x2c
+
+from corpus import mods_records
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def post(conn, path, body):
+    conn.request("POST", path, body)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{path}: {response.status} {data!r}")
+    return data
+
+
+def check(conn, records, rows):
+    for record, row in zip(records, rows):
+        assert json.loads(post(conn, "/mods/row", record)) == row
+        body = json.dumps(row).encode("utf8")
+        x = c2x.CsvRow(row)
+        assert post(conn, "/row/mods", body) == c2x.serialize(x.to_mods())
+        assert post(conn, "/row/dc", body) == c2x.serialize(x.to_dc())
+    batch = [record.decode("utf8") for record in records[:10]]
+    batch = json.loads(post(conn, "/mods/rows", json.dumps(batch).encode("utf8")))
+    assert batch == rows[:10]
+
+
+def timed(conn, path, bodies):
+    start = time.perf_counter()
+    for body in bodies:
+        post(conn, path, body)
+    return time.perf_counter() - start
+
+
+def concurrent(address, path, bodies, clients):
+    def client(share):
+        conn = http.client.HTTPConnection(*address)
+        for body in share:
+            post(conn, path, body)
+        conn.close()
+
+    threads = [
+        threading.Thread(target=client, args=(bodies[i::clients],))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def one_shot(tmp, record):
+    # What a caller without the server pays per record: a fresh isa run.
+    folder = Path(tmp, "one")
+    folder.mkdir(exist_ok=True)
+    Path(folder, "isu_0.xml").write_bytes(record)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "isa", str(folder), str(Path(tmp, "one.csv"))],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--records", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+
+    records = [
+        etree.tostring(mods, xml_declaration=True, encoding="UTF-8")
+        for _, mods in mods_records(args.records, compound_every=40)
+    ]
+    rows = [
+        dict(zip(x2c.HEADERS, x2c.XmlMD(etree.fromstring(r).getroottree()).to_row()))
+        for r in records
+    ]
+    row_bodies = [json.dumps(row).encode("utf8") for row in rows]
+    mods_batches = [
+        json.dumps([r.decode("utf8") for r in records[i : i + args.batch]]).encode()
+        for i in range(0, len(records), args.batch)
+    ]
+    row_batches = [
+        json.dumps(rows[i : i + args.batch]).encode("utf8")
+        for i in range(0, len(rows), args.batch)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "isa.sock")
+        servers = [
+            serve.make_server(("127.0.0.1", 0)),
+            serve.make_server(socket_path=socket_path),
+        ]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        address = servers[0].server_address[:2]
+        tcp = http.client.HTTPConnection(*address)
+        unix = UnixHTTPConnection(socket_path)
+
+        check(tcp, records[:50], rows[:50])
+        check(unix, records[:50], rows[:50])
+
+        n = len(records)
+        results = [
+            ("MODS->row", timed(tcp, "/mods/row", records), n),
+            ("MODS->row (unix)", timed(unix, "/mods/row", records), n),
+            ("row->MODS", timed(tcp, "/row/mods", row_bodies), n),
+            ("row->DC", timed(tcp, "/row/dc", row_bodies), n),
+            (
+                f"MODS->row x{args.batch}",
+                timed(tcp, "/mods/rows", mods_batches),
+                len(mods_batches),
+            ),
+            (
+                f"row->MODS x{args.batch}",
+                timed(tcp, "/rows/mods", row_batches),
+                len(row_batches),
+            ),
+            (
+                f"MODS->row {args.clients} clients",
+                concurrent(address, "/mods/row", records, args.clients),
+                n,
+            ),
+        ]
+        cli = min(one_shot(tmp, records[0]) for _ in range(3))
+
+        tcp.close()
+        unix.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    print(f"records:              {n}")
+    for name, seconds, requests in results:
+        print(
+            f"{name:<22} {1000 * seconds / requests:8.3f}ms/request  "
+            f"{n / seconds:9.1f} records/s"
+        )
+    print(f"{'python -m isa':<22} {1000 * cli:8.3f}ms/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Per-stage timings for both conversion directions, as JSON.
+
+    python benchmarks/suite.py [--sizes 1000 10000 ...] [--batch N] [--output FILE]
+
+For each size a synthetic corpus is written to a temporary directory in
+subdirectories of --batch files. Each stage runs on one batch at a time
+(load_xml over a subdirectory, save_csv to one CSV per batch, load_csv on
+that CSV, and so on), so 1M-record runs don't need the whole collection
+in memory. Corpus generation is timed but not part of any stage.
+"""
+import argparse
+import json
+from pathlib import Path
+import platform
+import shutil
+import tempfile
+import time
+
+import lxml
+
+from isa import csv2xml as c2x
+from isa import xml2csv as x2c
+
+from corpus import write_mods_corpus
+
+STAGES = (
+    "load_xml",
+    "xml_to_csv",
+    "save_csv",
+    "load_csv",
+    "CsvRow",
+    "CsvRow.to_mods",
+    "CsvRow.to_dc",
+    "save_xml",
+)
+
+
+class Stages:
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.items = dict.fromkeys(STAGES, 0)
+
+    def time(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.seconds[stage] += time.perf_counter() - start
+        return result
+
+    def results(self):
+        return {
+            stage: {
+                "seconds": round(self.seconds[stage], 4),
+                "items": self.items[stage],
+                "per_second": round(self.items[stage] / self.seconds[stage], 1)
+                if self.seconds[stage]
+                else None,
+            }
+            for stage in STAGES
+        }
+
+
+def run_batch(stages, xml_dir, work, engine, reorder):
+    mds = stages.time("load_xml", x2c.load_xml, xml_dir)
+    stages.items["load_xml"] += len(mds)
+
+    xml_mds = stages.time("xml_to_csv", x2c.xml_to_csv, mds, engine)
+    stages.items["xml_to_csv"] += len(xml_mds)
+    del mds
+
+    csv_path = work / "batch.csv"
+    stages.time("save_csv", x2c.save_csv, xml_mds, csv_path, reorder)
+    stages.items["save_csv"] += len(xml_mds)
+    del xml_mds
+
+    rows = stages.time("load_csv", c2x.load_csv, csv_path)
+    stages.items["load_csv"] += len(rows)
+
+    csv_rows = stages.time("CsvRow", c2x.csv_to_xml, rows)
+    stages.items["CsvRow"] += len(csv_rows)
+    stages.time("CsvRow.to_mods", lambda: [row.to_mods() for row in csv_rows])
+    stages.items["CsvRow.to_mods"] += len(csv_rows)
+    stages.time("CsvRow.to_dc", lambda: [row.to_dc() for row in csv_rows])
+    stages.items["CsvRow.to_dc"] += len(csv_rows)
+
+    # save_xml is timed on fresh rows, the way __main__ calls it.
+    csv_rows = c2x.csv_to_xml(rows)
+    output = work / "xml"
+    output.mkdir()
+
+    def save():
+        for row in csv_rows:
+            c2x.save_xml(row, "mods", output)
+            c2x.save_xml(row, "dc", output)
+
+    stages.time("save_xml", save)
+    stages.items["save_xml"] += 2 * len(csv_rows)
+    shutil.rmtree(output)
+
+
+def run_size(n, batch, engine, reorder, compound_every):
+    stages = Stages()
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp, "corpus")
+        corpus.mkdir()
+        start = time.perf_counter()
+        write_mods_corpus(corpus, n, compound_every=compound_every, shard=batch)
+        generate = time.perf_counter() - start
+
+        work = Path(tmp, "work")
+        work.mkdir()
+        for xml_dir in sorted(corpus.iterdir()):
+            run_batch(stages, xml_dir, work, engine, reorder)
+
+    return {
+        "records": n,
+        "batch": batch,
+        "corpus_seconds": round(generate, 4),
+        "stages": stages.results(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--engine", choices=x2c.ENGINES, default="xpath")
+    parser.add_argument("--compound-every", type=int, default=40)
+    parser.add_argument("--skip-compound-reorder", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "lxml": lxml.__version__,
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "compound_every": args.compound_every,
+        "runs": [
+            run_size(
+                n,
+                args.batch,
+                args.engine,
+                not args.skip_compound_reorder,
+                args.compound_every,
+            )
+            for n in args.sizes
+        ],
+    }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
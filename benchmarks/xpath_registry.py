@@ -0,0 +1,55 @@
+"""Compare per-call XPath strings against the precompiled XmlMD registry.
+
+    python benchmarks/xpath_registry.py [-n RECORDS] [XML_FILE]
+"""
+import argparse
+from pathlib import Path
+import time
+
+from lxml.etree import parse
+
+from isa import xml2csv as x2c
+
+FIXTURE = Path(__file__).parent.parent / "test" / "test_data" / "test.xml"
+
+
+def string_xpath_row(md):
+    # What XmlMD.__init__ did before the registry: one md.xpath() call per
+    # field, re-parsing the expression and namespace map every time.
+    values = {}
+    for name, expression, joined in x2c.FIELDS:
+        value = md.xpath(expression, namespaces=x2c.NS)
+        values[name] = "; ".join(value) if joined else value
+    return values
+
+
+def compiled_xpath_row(md):
+    return x2c.XmlMD(md)
+
+
+def records_per_second(func, mds):
+    start = time.perf_counter()
+    for md in mds:
+        func(md)
+    return len(mds) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("xml", nargs="?", default=FIXTURE)
+    parser.add_argument("-n", "--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    mds = [parse(str(args.xml))] * args.records
+
+    before = records_per_second(string_xpath_row, mds)
+    after = records_per_second(compiled_xpath_row, mds)
+
+    print(f"records:          {args.records}")
+    print(f"string XPath:     {before:10.1f} records/s")
+    print(f"compiled XPath:   {after:10.1f} records/s")
+    print(f"speedup:          {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,62 @@
 import argparse
+import cProfile
 from pathlib import Path
+import sys
 
+from isa import archive
 from isa import csv2xml as c2x
+from isa.cache import cache_path, RowCache
+from isa.columns import HEADERS, select_columns
+from isa import diff
+from isa.journal import fingerprint, Journal, journal_path
+from isa.manifest import Manifest
+from isa import merge
+from isa import serve
+from isa.timings import OFF, Timings
+from isa import watch
 from isa import xml2csv as x2c
 
 
 def main():
+    command = subcommand(sys.argv[1:])
+    if command is not None:
+        command(sys.argv[2:])
+        return
+
+    args = parse_args()
+    timings = Timings() if args.timings or args.timings_json else OFF
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(convert, args, timings)
+        profiler.dump_stats(args.profile)
+    else:
+        convert(args, timings)
+
+    if timings is not OFF:
+        print(timings.report())
+        if args.timings_json:
+            timings.save_json(args.timings_json)
+
+
+def subcommand(argv):
+    # The main() of isa diff, watch or serve, or None for a conversion. A
+    # first argument that names an existing file or folder is always the
+    # input, so `isa diff out.csv` still converts a folder named diff.
+    if not argv or Path(argv[0]).exists():
+        return None
+    return {
+        "diff": diff.main,
+        "watch": lambda argv: watch.main(argv, run),
+        "serve": serve.main,
+    }.get(argv[0])
+
+
+def run(argv):
+    # One conversion, as if from the command line, in this process.
+    convert(parse_args(argv), OFF)
+
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("input")
     parser.add_argument("output")
@@ -13,36 +64,245 @@ def main():
     parser.add_argument("--skip-compound-reorder", action="store_true")
     parser.add_argument("--new-compound-reorder", action="store_true")
     parser.add_argument("--generate-dc", action="store_true")
-    args = parser.parse_args()
+    parser.add_argument("--engine", choices=x2c.ENGINES, default="xpath")
+    parser.add_argument("--reorder-window", type=int, default=x2c.REORDER_WINDOW)
+    parser.add_argument("--reorder-stats", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--rebuild-cache", action="store_true")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--rebuild-manifest", action="store_true")
+    parser.add_argument("--timings", action="store_true")
+    parser.add_argument("--timings-json")
+    parser.add_argument("--profile")
+    parser.add_argument("--field-stats", action="store_true")
+    parser.add_argument("--columns")
+    parser.add_argument(
+        "--output-format", choices=("files", "zip", "collection"), default="files"
+    )
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--shard", choices=("hash", "count"))
+    parser.add_argument("--shard-size", type=int, default=10000)
+    parser.add_argument("--shard-prefix", type=int, default=2)
+    parser.add_argument("--merge", action="store_true")
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args(argv)
+    if args.columns is not None:
+        try:
+            args.columns = select_columns(args.columns)
+        except ValueError as e:
+            parser.error(str(e))
+    input_ = Path(args.input)
+    if (args.cache or args.rebuild_cache) and archive.is_archive(input_):
+        parser.error("--cache needs a directory of XML files, not an archive")
+    if args.field_stats and (
+        args.workers != 1 or args.cache or args.rebuild_cache or args.engine != "xpath"
+    ):
+        parser.error("--field-stats needs --workers 1, --engine xpath and no cache")
+    if args.output_format != "files":
+        if args.workers != 1 or args.incremental or args.rebuild_manifest:
+            parser.error(
+                f"--output-format {args.output_format} can't be combined with "
+                "--workers or --incremental"
+            )
+        if args.shard or args.merge:
+            parser.error("--shard and --merge only apply to --output-format files")
+        if args.output_format == "collection" and args.generate_dc:
+            parser.error("a modsCollection holds MODS only; drop --generate-dc")
+    if args.merge and (args.incremental or args.rebuild_manifest):
+        parser.error("--merge already skips unchanged files; drop --incremental")
+    if args.resume and (
+        args.cache
+        or args.rebuild_cache
+        or args.field_stats
+        or args.incremental
+        or args.rebuild_manifest
+        or args.merge
+        or args.output_format != "files"
+    ):
+        parser.error(
+            "--resume can't be combined with --cache, --field-stats, "
+            "--incremental, --merge or --output-format"
+        )
 
+    return args
+
+
+def convert(args, timings):
     input_ = Path(args.input)
     output = Path(args.output)
 
-    if input_.is_dir():
-        if args.alpha_sort:
-            xmls = x2c.load_xml(input_, True)
+    if input_.is_dir() or archive.is_archive(input_):
+        row_cache = None
+        journal = None
+        # Cached rows are always full width so the cache serves any
+        # --columns; otherwise only the requested columns (and the ones
+        # compound reordering reads) are extracted.
+        extract = args.columns
+        if extract is not None and not args.skip_compound_reorder:
+            extract = extract + list(x2c.REORDER_COLUMNS)
+        with timings.stage("list xml"):
+            paths = x2c.xml_sources(input_, args.alpha_sort, args.recursive)
+        if args.cache or args.rebuild_cache:
+            row_cache = RowCache(cache_path(output), args.rebuild_cache)
+            rows = x2c.iter_rows_cached(paths, row_cache, args.engine, args.workers)
+            rows = timings.iterate("cached rows", rows)
+        elif args.resume:
+            journal = Journal(
+                journal_path(output),
+                fingerprint(
+                    "xml2csv",
+                    str(input_.resolve()),
+                    args.engine,
+                    extract,
+                    args.alpha_sort,
+                    args.recursive,
+                ),
+            )
+            rows = x2c.iter_rows_journaled(
+                paths, journal, args.engine, args.workers or None, columns=extract
+            )
+            rows = timings.iterate("journaled rows", rows)
+        elif args.workers == 1:
+            field_stats = x2c.FieldStats() if args.field_stats else None
+            xmls = timings.iterate("parse", x2c.iter_parsed(paths))
+            rows = x2c.iter_rows(xmls, args.engine, field_stats, extract)
+            rows = timings.iterate("extract", rows)
         else:
-            xmls = x2c.load_xml(input_)
-        csv = x2c.xml_to_csv(xmls)
+            rows = x2c.iter_rows_parallel(
+                paths, args.engine, args.workers or None, columns=extract
+            )
+            rows = timings.iterate("parallel rows", rows)
+
+        stats = None
         if args.skip_compound_reorder:
             print("Skipping compound reorder")
-            x2c.save_csv(csv, output, False)
         else:
-            if args.new_compound_reorder:
-                x2c.save_csv(csv, output, new=True)
-            else:
-                x2c.save_csv(csv, output)
+            stats = x2c.ReorderStats() if args.reorder_stats else None
+            rows = x2c.iter_reordered(
+                rows,
+                args.new_compound_reorder,
+                args.reorder_window or None,
+                stats,
+            )
+            rows = timings.iterate("reorder", rows)
+
+        with timings.stage("write csv"):
+            x2c.write_csv(rows, output, False, columns=args.columns)
+        if journal is not None:
+            journal.finish()
+        if args.field_stats:
+            print(field_stats.report())
+            print(f"Always empty: {', '.join(field_stats.empty()) or 'none'}")
+        if stats is not None:
+            print(
+                f"Compound reorder: {stats.parents} parents, "
+                f"{stats.pages} pages, {stats.seconds:.3f}s"
+            )
+        if row_cache is not None:
+            row_cache.close()
+            print(
+                f"Cache: {row_cache.hits} unchanged, {row_cache.rehashed} touched, "
+                f"{row_cache.parsed} parsed"
+            )
     else:
-        csv = c2x.load_csv(input_)
+        header = c2x.csv_header(input_)
+        present = [name for name in HEADERS if name in header]
+        if header and len(present) < len(HEADERS):
+            others = (
+                "kept from the existing files"
+                if args.merge
+                else "left empty in the XML"
+            )
+            print(
+                f"CSV has {len(present)} of {len(HEADERS)} columns; "
+                f"the others are {others}"
+            )
+        # Rows are read, built and written one at a time rather than loading
+        # the whole spreadsheet first.
+        csv = timings.iterate("read csv", c2x.iter_csv(input_))
+
+        if args.output_format != "files":
+            xmls = timings.iterate("CsvRow", (c2x.CsvRow(md) for md in csv))
+            if args.output_format == "zip":
+                written = c2x.save_zip(xmls, output, args.generate_dc, timings)
+            else:
+                written = c2x.save_collection(xmls, output, timings)
+            print(f"Wrote {written} records to {output}")
+            return
+
         output.mkdir(exist_ok=True)
+        layout = None
+        if args.shard:
+            layout = c2x.ShardLayout(
+                output,
+                args.shard,
+                args.shard_size,
+                args.shard_prefix,
+                args.generate_dc,
+            )
 
-        xmls = c2x.csv_to_xml(csv)
-        for x in xmls:
-            c2x.save_xml(x, "mods", output)
+        manifest = None
+        if args.incremental or args.rebuild_manifest:
+            manifest = Manifest(output, args.rebuild_manifest)
+        journal = None
+        if args.resume:
+            journal = Journal(
+                journal_path(output),
+                fingerprint(
+                    "csv2xml",
+                    str(input_.resolve()),
+                    str(output.resolve()),
+                    args.generate_dc,
+                    args.shard,
+                    args.shard_size,
+                    args.shard_prefix,
+                ),
+            )
+
+        try:
+            if args.workers != 1:
+                with timings.stage("parallel save"):
+                    written, failed = c2x.save_xml_parallel(
+                        csv,
+                        output,
+                        args.generate_dc,
+                        args.workers or None,
+                        manifest=manifest,
+                        layout=layout,
+                        save_rows=merge.merge_rows if args.merge else None,
+                        journal=journal,
+                    )
+                print(f"Wrote {written} files; {len(failed)} rows failed")
+                for row_number, pid, error in failed:
+                    print(f"Row {row_number} ({pid or 'no pid'}): {error}")
+                if failed and journal is not None:
+                    print("Run again with --resume to retry the failed rows")
+                    journal.close()
+                    journal = None
+            elif args.merge:
+                with timings.stage("merge"):
+                    added, patched, unchanged = merge.save_xml_merged(
+                        csv, output, args.generate_dc, layout
+                    )
+                print(f"Rows: {added} added, {patched} patched, {unchanged} unchanged")
+            else:
+                c2x.save_xml_stream(
+                    csv, output, args.generate_dc, manifest, layout, timings, journal
+                )
+        finally:
+            if layout is not None:
+                layout.close()
+        if journal is not None:
+            journal.finish()
 
-        if args.generate_dc:
-            for x in xmls:
-                c2x.save_xml(x, "dc", output)
+        if manifest is not None:
+            print(
+                f"Rows: {manifest.added} added, {manifest.changed} changed, "
+                f"{manifest.restored} restored, {manifest.unchanged} unchanged, "
+                f"{len(manifest.removed())} removed"
+            )
+            manifest.save()
 
 
 if __name__ == "__main__":
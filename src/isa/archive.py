@@ -0,0 +1,92 @@
+import tarfile
+import tempfile
+import zipfile
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# Bytes of out-of-order members of a compressed tar kept in memory; past
+# this they're spooled to a temporary file instead.
+HELD_LIMIT = 16 * 1024 * 1024
+
+
+def is_archive(path):
+    return path.is_file() and path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _is_xml(name):
+    # macOS zips carry "__MACOSX/._name.xml" resource forks alongside the
+    # real files.
+    return name.endswith(".xml") and not name.startswith("__MACOSX/")
+
+
+def member_names(path):
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return [
+                info.filename
+                for info in zf.infolist()
+                if not info.is_dir() and _is_xml(info.filename)
+            ]
+
+    with tarfile.open(path) as tf:
+        return [m.name for m in tf.getmembers() if m.isfile() and _is_xml(m.name)]
+
+
+def iter_members(path, names):
+    # Yields (name, bytes) for names, in that order, without extracting
+    # anything to disk.
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in names:
+                yield name, zf.read(name)
+        return
+
+    try:
+        tf = tarfile.open(path, "r:")
+    except tarfile.ReadError:
+        yield from _iter_compressed(path, names)
+        return
+
+    # An uncompressed tar can seek to each member.
+    with tf:
+        members = {m.name: m for m in tf.getmembers() if m.isfile()}
+        for name in names:
+            yield name, tf.extractfile(members[name]).read()
+
+
+def _iter_compressed(path, names):
+    # Compressed tars can't seek, so read the stream once in archive order.
+    # Members that turn up before their turn are held until it comes; when
+    # the archive is already in the wanted order nothing is held. Archives
+    # packed in directory order (tar czf) can be far out of order, so past
+    # HELD_LIMIT bytes held members go to a temporary file, and held maps
+    # their names to (offset, size) in it.
+    wanted = set(names)
+    order = iter(names)
+    next_name = next(order, None)
+    held = {}
+    held_bytes = 0
+    with tarfile.open(path, "r|*") as tf, tempfile.TemporaryFile() as spool:
+        for member in tf:
+            if member.name not in wanted or not member.isfile():
+                continue
+            data = tf.extractfile(member).read()
+            if member.name != next_name and held_bytes + len(data) > HELD_LIMIT:
+                if spool.tell() == 0:
+                    print(f"{path} isn't in file order; spooling to a temporary file")
+                held[member.name] = (spool.tell(), len(data))
+                spool.write(data)
+            else:
+                held[member.name] = data
+                held_bytes += len(data)
+            while next_name in held:
+                data = held.pop(next_name)
+                if isinstance(data, tuple):
+                    offset, size = data
+                    spool.seek(offset)
+                    data = spool.read(size)
+                    spool.seek(0, 2)
+                else:
+                    held_bytes -= len(data)
+                yield next_name, data
+                next_name = next(order, None)
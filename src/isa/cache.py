@@ -0,0 +1,69 @@
+from hashlib import sha1
+import json
+import sqlite3
+
+from isa.columns import HEADERS
+
+# Bump when XmlMD starts extracting something differently so old rows
+# aren't reused.
+CACHE_VERSION = 1
+
+
+def cache_path(output_path):
+    return output_path.with_name(f"{output_path.name}.cache")
+
+
+def digest(data):
+    return sha1(data).hexdigest()
+
+
+class RowCache:
+    def __init__(self, path, rebuild=False):
+        self.db = sqlite3.connect(str(path))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rows "
+            "(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "digest TEXT, row TEXT)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.db.execute("CREATE TEMP TABLE seen (path TEXT PRIMARY KEY)")
+
+        schema = json.dumps([CACHE_VERSION, HEADERS])
+        stored = self.db.execute(
+            "SELECT value FROM meta WHERE key = 'schema'"
+        ).fetchone()
+        if rebuild or stored is None or stored[0] != schema:
+            self.db.execute("DELETE FROM rows")
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (schema,)
+            )
+
+        self.hits = 0
+        self.rehashed = 0
+        self.parsed = 0
+
+    def lookup(self, path):
+        # (size, mtime_ns, digest, row) for path, or None.
+        self.db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (path,))
+        return self.db.execute(
+            "SELECT size, mtime_ns, digest, row FROM rows WHERE path = ?", (path,)
+        ).fetchone()
+
+    def row(self, entry):
+        return json.loads(entry[3])
+
+    def store(self, path, stat, digest, row):
+        self.db.execute(
+            "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, digest, json.dumps(row)),
+        )
+
+    def prune(self):
+        # Drop files that weren't looked up, once a whole directory has been.
+        self.db.execute("DELETE FROM rows WHERE path NOT IN (SELECT path FROM seen)")
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
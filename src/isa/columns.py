@@ -0,0 +1,225 @@
+"""The spreadsheet columns shared by xml2csv and csv2xml."""
+
+# (column, whether it holds several values separated by ";"), in CSV order.
+COLUMNS = (
+    ("pid", False),
+    ("title", False),
+    ("archival_call_number", False),
+    ("archival_collection", False),
+    ("finding_aid_ark", False),
+    ("physical_location", False),
+    ("archival_series_title", False),
+    ("folder_title", False),
+    ("box", False),
+    ("folder", False),
+    ("contributing_institution", False),
+    ("contributing_institution_valueURI", False),
+    ("personal_creator", True),
+    ("personal_creator_valueURI", True),
+    ("corporate_creator", True),
+    ("corporate_creator_valueURI", True),
+    ("interviewee", True),
+    ("interviewee_valueURI", True),
+    ("interviewer", True),
+    ("interviewer_valueURI", True),
+    ("personal_contributor", True),
+    ("personal_contributor_valueURI", True),
+    ("corporate_contributor", True),
+    ("corporate_contributor_valueURI", True),
+    ("description", False),
+    ("table_of_contents", False),
+    ("annotation", False),
+    ("url", False),
+    ("language", True),
+    ("topical_subject_fast", True),
+    ("topical_subject_fast_valueURI", True),
+    ("geographic_subject_fast", True),
+    ("geographic_subject_fast_valueURI", True),
+    ("topical_subject_lcsh", True),
+    ("topical_subject_lcsh_valueURI", True),
+    ("topical_subject_local", True),
+    ("topical_subject_local_valueURI", True),
+    ("geographic_subject_lcsh", True),
+    ("geographic_subject_lcsh_valueURI", True),
+    ("geographic_subject_local", True),
+    ("geographic_subject_local_valueURI", True),
+    ("geographic_subject_geonames", True),
+    ("geographic_subject_geonames_valueURI", True),
+    ("coordinates", True),
+    ("personal_name_subject", True),
+    ("personal_name_subject_valueURI", True),
+    ("corporate_name_subject", True),
+    ("corporate_name_subject_valueURI", True),
+    ("birds_subject", True),
+    ("birds_subject_valueURI", True),
+    ("chronological_subject", True),
+    ("event_subject", True),
+    ("event_subject_valueURI", True),
+    ("extent", True),
+    ("aat_type", True),
+    ("aat_type_valueURI", True),
+    ("aat_genre", True),
+    ("aat_genre_valueURI", True),
+    ("dcmi_type", True),
+    ("dcmi_type_valueURI", True),
+    ("type_of_resource", True),
+    ("imt_type", False),
+    ("cco_description", False),
+    ("rights_management", True),
+    ("rights_management_valueURI", True),
+    ("date_original", False),
+    ("date_digital", False),
+    ("location_interview", False),
+    ("publisher", False),
+    ("publisher_valueURI", False),
+    ("ark", False),
+    ("local_id", False),
+    ("file_name", False),
+    ("uid", False),
+    ("avian_id", False),
+    ("project_number", False),
+    ("date_created", False),
+    ("date_modified", False),
+    ("issuance", False),
+    ("issuance_start", False),
+    ("issuance_end", False),
+    ("frequency", False),
+    ("digital_collection", False),
+    ("digital_collection_ark", False),
+    ("related_exhibit", False),
+    ("related_exhibit_url", False),
+    ("hardware_software", False),
+    ("disclaimer", False),
+    ("image_manipulation", False),
+    ("file_size", False),
+    ("resolution", False),
+    ("colorspace", False),
+    ("bits_per_sample", False),
+    ("samples_per_pixel", False),
+    ("height", False),
+    ("width", False),
+    ("digital_origin", False),
+)
+
+# Columns csv2xml reads that xml2csv does not export.
+INGEST_COLUMNS = (
+    ("label", False),
+    ("binary_file", False),
+    ("parent_object", False),
+    ("cmodel", False),
+    ("parent_predicate", False),
+    ("parent_uri", False),
+    ("transcript", False),
+    ("reformatting_quality", False),
+)
+
+HEADERS = [name for name, _ in COLUMNS]
+
+
+# Named column sets for --columns.
+PROFILES = {
+    "collection": (
+        "archival_call_number",
+        "archival_collection",
+        "finding_aid_ark",
+        "physical_location",
+        "archival_series_title",
+        "folder_title",
+        "box",
+        "folder",
+        "digital_collection",
+        "digital_collection_ark",
+        "related_exhibit",
+        "related_exhibit_url",
+    ),
+    "names": (
+        "contributing_institution",
+        "contributing_institution_valueURI",
+        "personal_creator",
+        "personal_creator_valueURI",
+        "corporate_creator",
+        "corporate_creator_valueURI",
+        "interviewee",
+        "interviewee_valueURI",
+        "interviewer",
+        "interviewer_valueURI",
+        "personal_contributor",
+        "personal_contributor_valueURI",
+        "corporate_contributor",
+        "corporate_contributor_valueURI",
+    ),
+    "description": (
+        "description",
+        "table_of_contents",
+        "annotation",
+        "language",
+        "disclaimer",
+        "hardware_software",
+    ),
+    "subjects": tuple(
+        name for name in HEADERS if "_subject" in name or name == "coordinates"
+    ),
+    "genres": (
+        "aat_type",
+        "aat_type_valueURI",
+        "aat_genre",
+        "aat_genre_valueURI",
+        "dcmi_type",
+        "dcmi_type_valueURI",
+        "type_of_resource",
+        "imt_type",
+        "cco_description",
+    ),
+    "rights": ("rights_management", "rights_management_valueURI"),
+    "origin": (
+        "date_original",
+        "date_digital",
+        "location_interview",
+        "publisher",
+        "publisher_valueURI",
+        "date_created",
+        "date_modified",
+        "issuance",
+        "issuance_start",
+        "issuance_end",
+        "frequency",
+    ),
+    "identifiers": (
+        "url",
+        "ark",
+        "local_id",
+        "file_name",
+        "uid",
+        "avian_id",
+        "project_number",
+    ),
+    "technical": (
+        "extent",
+        "image_manipulation",
+        "file_size",
+        "resolution",
+        "colorspace",
+        "bits_per_sample",
+        "samples_per_pixel",
+        "height",
+        "width",
+        "digital_origin",
+    ),
+}
+
+
+def select_columns(spec):
+    # Turns "title,subjects,rights" (column and profile names) into columns
+    # in CSV order. pid is always kept so rows can be matched back to
+    # their objects.
+    selected = {"pid"}
+    for item in spec.split(","):
+        item = item.strip()
+        if item in PROFILES:
+            selected.update(PROFILES[item])
+        elif item in HEADERS:
+            selected.add(item)
+        elif item:
+            raise ValueError(f"Unknown column or profile: {item}")
+
+    return [name for name in HEADERS if name in selected]
@@ -1,233 +1,392 @@
+from concurrent.futures import (
+    as_completed,
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait,
+)
+from copy import deepcopy
 import csv
-from io import BytesIO, StringIO
-from itertools import zip_longest
+from io import StringIO
+import os
+from itertools import islice, zip_longest
 from pathlib import Path
 from xml.sax.saxutils import escape
+import zipfile
 
 from lxml import etree
 from lxml.builder import E, ElementMaker
 
+from isa.cache import digest
+from isa.columns import COLUMNS, INGEST_COLUMNS
+from isa.manifest import row_digest
+from isa.timings import OFF
+
+XML_WHITESPACE = " \t\r\n"
+
+MODS_ROOT = etree.fromstring(
+    b"""<?xml version='1.0' encoding='UTF-8'?>
+<mods xmlns="http://www.loc.gov/mods/v3"
+      xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+      xsi:schemaLocation="http://www.loc.gov/mods/v3 http://www.loc.gov/standards/mods/v3/mods-3-8.xsd" version="3.8">
+</mods>"""
+)
+DC_ROOT = etree.fromstring(
+    b"""<?xml version="1.0" encoding="UTF-8"?>
+<oai_dc:dc xmlns:dc="http://purl.org/dc/elements/1.1/"
+           xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/"
+           xmlns:srw_dc="info:srw/schema/1/dc-schema"
+           xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+           xsi:schemaLocation="http://www.openarchives.org/OAI/2.0/oai_dc/ http://www.openarchives.org/OAI/2.0/oai_dc.xsd">
+</oai_dc:dc>"""
+)
+
+SHARD_INDEX = "shards.csv"
+
+MODS_COLLECTION = "{http://www.loc.gov/mods/v3}modsCollection"
+MODS_NSMAP = {None: "http://www.loc.gov/mods/v3"}
+
+# Every column CsvRow reads, with whether it holds ";"-separated values.
+CSV_COLUMNS = COLUMNS + INGEST_COLUMNS
+
+DC_NAMESPACE = "http://purl.org/dc/elements/1.1/"
+DC_NSMAP = {"dc": DC_NAMESPACE}
+DC_E = ElementMaker(namespace=DC_NAMESPACE, nsmap=DC_NSMAP)
+
 
 def load_csv(csv_file, newline="", delimiter=",", dialect="excel", encoding="utf8"):
+    return list(iter_csv(csv_file, newline, delimiter, dialect, encoding))
+
+
+def iter_csv(csv_file, newline="", delimiter=",", dialect="excel", encoding="utf8"):
     with open(csv_file, "r", newline=newline, encoding=encoding) as fh:
-        md = list(csv.DictReader(fh, delimiter=delimiter, dialect=dialect))
+        yield from csv.DictReader(fh, delimiter=delimiter, dialect=dialect)
 
-    return md
 
+def csv_header(csv_file, newline="", delimiter=",", dialect="excel", encoding="utf8"):
+    with open(csv_file, "r", newline=newline, encoding=encoding) as fh:
+        return next(csv.reader(fh, delimiter=delimiter, dialect=dialect), [])
 
-def csv_to_xml(mds):
-    return [CsvRow(md) for md in mds]
 
+def csv_to_xml(mds, manifest=None, generate_dc=False, output_folder=""):
+    # With a manifest, only rows whose values changed since it was written
+    # (or whose files in output_folder are missing or edited) are built.
+    if manifest is None:
+        return [CsvRow(md) for md in mds]
 
-def save_xml(md, schema="mods", output_folder=""):
-    parser = etree.XMLParser(remove_blank_text=True)
-    file_name = (
-        f"{md.pid.split(':')[-1]}.xml"
-        if schema == "mods"
-        else f"dc-{md.pid.split(':')[-1]}.xml"
+    return [
+        CsvRow(md)
+        for md in mds
+        if _needs_write(md, manifest, generate_dc, output_folder)
+    ]
+
+
+def _needs_write(md, manifest, generate_dc, folder):
+    schemas = ("mods", "dc") if generate_dc else ("mods",)
+    pid = md.get("pid", "")
+    return manifest.needs_write(
+        md, [Path(folder, xml_file_name(pid, s)) for s in schemas]
     )
-    xml = md.to_mods() if schema == "mods" else md.to_dc()
-    output = etree.parse(
-        BytesIO(etree.tostring(xml, xml_declaration=True, encoding="UTF-8")),
-        parser,
+
+
+def xml_file_name(pid, schema="mods"):
+    return (
+        f"{pid.split(':')[-1]}.xml"
+        if schema == "mods"
+        else f"dc-{pid.split(':')[-1]}.xml"
     )
-    with open(Path(output_folder, file_name), "w", encoding="utf8") as fh:
-        fh.write(
-            etree.tostring(
-                output,
-                pretty_print=True,
-                xml_declaration=True,
-                encoding="UTF-8",
-            ).decode("utf8")
+
+
+def save_xml(md, schema="mods", output_folder="", manifest=None, timings=OFF):
+    file_name, data = write_xml(md, schema, output_folder, timings)
+    if manifest is not None:
+        manifest.wrote(md.pid, Path(output_folder, file_name), digest(data))
+
+
+def write_xml(md, schema, output_folder, timings=OFF):
+    # Writes md's MODS or DC file without a manifest; returns what build_xml
+    # does.
+    file_name, data = build_xml(md, schema, timings)
+    with timings.stage("write xml"):
+        with open(Path(output_folder, file_name), "wb") as fh:
+            fh.write(data)
+
+    return file_name, data
+
+
+def build_xml(md, schema, timings=OFF):
+    # (file name, serialized bytes) of a CsvRow's MODS or DC.
+    with timings.stage(f"to_{schema}"):
+        xml = md.to_mods() if schema == "mods" else md.to_dc()
+    with timings.stage("serialize"):
+        data = serialize(xml)
+
+    return xml_file_name(md.pid, schema), data
+
+
+class ShardLayout:
+    # Which subdirectory of output_folder a row's files go in: the first
+    # prefix hex digits of the SHA-1 of its pid ("hash"), or size rows per
+    # numbered directory in CSV order ("count"). Folders are created as
+    # they're first used, and SHARD_INDEX lists where each pid's files are.
+    def __init__(
+        self, output_folder, mode="hash", size=10000, prefix=2, generate_dc=False
+    ):
+        self.output_folder = Path(output_folder)
+        self.mode = mode
+        self.size = size
+        self.prefix = prefix
+        self.generate_dc = generate_dc
+        self.made = set()
+        self.index = open(
+            Path(output_folder, SHARD_INDEX), "w", encoding="utf8", newline=""
         )
+        self.writer = csv.writer(self.index)
+        self.writer.writerow(["pid", "mods", "dc"])
+
+    def folder(self, pid, row_number):
+        # Call once per CSV row, including rows that won't be rewritten, so
+        # the index is complete and "count" shards don't shift.
+        if self.mode == "hash":
+            shard = digest(pid.encode("utf8"))[: self.prefix]
+        else:
+            shard = f"{(row_number - 1) // self.size:05d}"
+
+        folder = self.output_folder / shard
+        if shard not in self.made:
+            folder.mkdir(exist_ok=True)
+            self.made.add(shard)
+
+        dc = f"{shard}/{xml_file_name(pid, 'dc')}" if self.generate_dc else ""
+        self.writer.writerow([pid, f"{shard}/{xml_file_name(pid, 'mods')}", dc])
+        return folder
+
+    def close(self):
+        self.index.close()
+
+
+def save_xml_stream(
+    mds,
+    output_folder="",
+    generate_dc=False,
+    manifest=None,
+    layout=None,
+    timings=OFF,
+    journal=None,
+):
+    # Builds, writes and drops one row at a time, so memory doesn't grow
+    # with the CSV when mds is an iterator (see iter_csv). Returns the
+    # number of files written. With a journal, each row is recorded once
+    # its files are written, and rows it already has are skipped.
+    schemas = ("mods", "dc") if generate_dc else ("mods",)
+    written = 0
+    for row_number, md, folder in rows_to_write(
+        mds, output_folder, generate_dc, manifest, layout, _journaled(journal)
+    ):
+        with timings.stage("CsvRow"):
+            x = CsvRow(md)
+        for schema in schemas:
+            save_xml(x, schema, folder, manifest, timings)
+            written += 1
+        if journal is not None:
+            journal.record(row_number, x.pid, row_digest(md))
+            journal.checkpoint()
+
+    return written
+
+
+def rows_to_write(
+    mds, output_folder="", generate_dc=False, manifest=None, layout=None, done=None
+):
+    # (row number, md, folder) for each row that needs writing: all of them
+    # without a manifest. done maps row numbers already written (see
+    # _journaled) to their row digests.
+    for row_number, md in enumerate(mds, 1):
+        pid = md.get("pid", "")
+        folder = output_folder if layout is None else layout.folder(pid, row_number)
+        if done and done.get(row_number) == row_digest(md):
+            continue
+        if manifest is None or _needs_write(md, manifest, generate_dc, folder):
+            yield row_number, md, folder
+
+
+def _journaled(journal):
+    # Rows a journal says were written, if they're still the same rows.
+    if journal is None:
+        return None
+    return {row_number: row for _, (row_number, _, row) in journal.replay()}
+
+
+def save_zip(mds, output_path, generate_dc=False, timings=OFF):
+    # The same files save_xml would write, as members of one zip (an
+    # Islandora batch-ingest package), each row's MODS followed by its DC.
+    schemas = ("mods", "dc") if generate_dc else ("mods",)
+    written = 0
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for md in mds:
+            for schema in schemas:
+                file_name, data = build_xml(md, schema, timings)
+                with timings.stage("write zip"):
+                    zf.writestr(file_name, data)
+                written += 1
+
+    return written
+
+
+def save_collection(mds, output_path, timings=OFF):
+    # Every row's MODS as a child of one <modsCollection>, streamed out with
+    # lxml's incremental writer.
+    written = 0
+    with etree.xmlfile(str(output_path), encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element(MODS_COLLECTION, nsmap=MODS_NSMAP):
+            xf.write("\n")
+            for md in mds:
+                with timings.stage("to_mods"):
+                    mods = md.to_mods()
+                with timings.stage("write collection"):
+                    remove_blank_text(mods)
+                    xf.write(mods, pretty_print=True)
+                written += 1
+
+    return written
+
+
+def serialize(xml):
+    remove_blank_text(xml)
+    return etree.tostring(
+        xml,
+        pretty_print=True,
+        xml_declaration=True,
+        encoding="UTF-8",
+    )
+
+
+def remove_blank_text(xml):
+    # Does in place what re-parsing with remove_blank_text=True would: drop
+    # whitespace-only text between elements (but not in mixed content or
+    # leaves) so the pretty printer can indent, and empty text so leaves
+    # serialize as <element/>.
+    for el in xml.iter():
+        if el.text == "":
+            el.text = None
+        if el.tail is not None and not el.tail.strip(XML_WHITESPACE):
+            parent = el.getparent()
+            if parent is not None and not (parent.text or "").strip(XML_WHITESPACE):
+                el.tail = None
+        if len(el) and el.text is not None and not el.text.strip(XML_WHITESPACE):
+            el.text = None
+
+
+def save_xml_parallel(
+    mds,
+    output_folder="",
+    generate_dc=False,
+    workers=None,
+    chunk_size=64,
+    manifest=None,
+    layout=None,
+    save_rows=None,
+    journal=None,
+):
+    # Shards the CSV rows across worker processes, each of which builds and
+    # writes its own MODS (and DC) files. Returns the number of files written
+    # and a sorted list of (row number, pid, error) for rows that failed.
+    # With a manifest, unchanged rows are skipped and the digests of the
+    # files the workers wrote are recorded in it. mds can be an iterator;
+    # only a couple of chunks per worker are read ahead. save_rows replaces
+    # what each worker does with a chunk (see merge.merge_rows). journal is
+    # as for save_xml_stream.
+    workers = workers or os.cpu_count() or 1
+    save_rows = save_rows or _save_rows
+    rows = rows_to_write(
+        mds, output_folder, generate_dc, manifest, layout, _journaled(journal)
+    )
+    report_every = 20 * chunk_size
+    progress = [0, 0, []]  # rows done, files written, failures
+    last_report = 0
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending = {}
+        while chunk := list(islice(rows, chunk_size)):
+            pending[executor.submit(save_rows, chunk, generate_dc)] = chunk
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    _finish_rows(future, chunk, progress, manifest, journal)
+            if progress[0] - last_report >= report_every:
+                print(f"Processed {progress[0]} rows")
+                last_report = progress[0]
+
+        for future in as_completed(pending):
+            _finish_rows(future, pending[future], progress, manifest, journal)
+
+    print(f"Processed {progress[0]} rows")
+    return progress[1], sorted(progress[2])
+
+
+def _finish_rows(future, chunk, progress, manifest, journal=None):
+    chunk_rows, chunk_written, chunk_failed = future.result()
+    progress[0] += chunk_rows
+    progress[1] += len(chunk_written)
+    progress[2].extend(chunk_failed)
+    if manifest is not None:
+        folders = {md.get("pid", ""): folder for _, md, folder in chunk}
+        for pid, file_name, file_digest in chunk_written:
+            manifest.wrote(pid, Path(folders[pid], file_name), file_digest)
+    if journal is not None:
+        # Failed rows are left out so a resumed run tries them again.
+        failed = {row_number for row_number, _, _ in chunk_failed}
+        for row_number, md, _ in chunk:
+            if row_number not in failed:
+                journal.record(row_number, md.get("pid", ""), row_digest(md))
+        journal.checkpoint()
+
+
+def _save_rows(rows, generate_dc):
+    # Returns (pid, file name, digest) for each file written, and the
+    # failures.
+    written = []
+    failed = []
+    for row_number, md, output_folder in rows:
+        try:
+            x = CsvRow(md)
+            for schema in ("mods", "dc") if generate_dc else ("mods",):
+                file_name, data = write_xml(x, schema, output_folder)
+                written.append((x.pid, file_name, digest(data)))
+        except Exception as e:
+            failed.append((row_number, md.get("pid", ""), f"{type(e).__name__}: {e}"))
+
+    return len(rows), written, failed
+
+
+def _split(value):
+    return [m.strip() for m in value.split(";")]
 
 
 class CsvRow:
+    dc_namespace = DC_NAMESPACE
+    dc_nsmap = DC_NSMAP
+    dc_E = DC_E
+    dc_separator = "; "
+
+    __slots__ = tuple(name for name, _ in CSV_COLUMNS) + (
+        "mods_root",
+        "mods",
+        "dc_root",
+        "dc",
+    )
+
     def __init__(self, md):
-        self.md = md
-        self.mods_root = etree.fromstring(
-            b"""<?xml version='1.0' encoding='UTF-8'?>
-<mods xmlns="http://www.loc.gov/mods/v3"
-      xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-      xsi:schemaLocation="http://www.loc.gov/mods/v3 http://www.loc.gov/standards/mods/v3/mods-3-8.xsd" version="3.8">
-</mods>"""
-        )
-        self.mods = self.mods_root
-        self.dc_root = etree.fromstring(
-            b"""<?xml version="1.0" encoding="UTF-8"?>
-<oai_dc:dc xmlns:dc="http://purl.org/dc/elements/1.1/"
-           xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/"
-           xmlns:srw_dc="info:srw/schema/1/dc-schema"
-           xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-           xsi:schemaLocation="http://www.openarchives.org/OAI/2.0/oai_dc/ http://www.openarchives.org/OAI/2.0/oai_dc.xsd">
-</oai_dc:dc>"""
-        )
-        self.dc = self.dc_root
-        self.label = md.get("label", "")
-        self.binary_file = md.get("binary_file", "")
-        self.parent_object = md.get("parent_object", "")
-        self.cmodel = md.get("cmodel", "")
-        self.pid = md.get("pid", "")
-        self.parent_predicate = md.get("parent_predicate", "")
-        self.parent_uri = md.get("parent_uri", "")
-        self.title = md.get("title", "")
-        self.archival_call_number = md.get("archival_call_number", "")
-        self.archival_collection = md.get("archival_collection", "")
-        self.finding_aid_ark = md.get("finding_aid_ark", "")
-        self.physical_location = md.get("physical_location", "")
-        self.archival_series_title = md.get("archival_series_title", "")
-        self.folder_title = md.get("folder_title", "")
-        self.box = md.get("box", "")
-        self.folder = md.get("folder", "")
-        self.contributing_institution = md.get("contributing_institution", "")
-        self.contributing_institution_valueURI = md.get(
-            "contributing_institution_valueURI", ""
-        )
-        self.personal_creator = self._get_concatenated_field("personal_creator")
-        self.corporate_creator = self._get_concatenated_field("corporate_creator")
-        self.interviewee = self._get_concatenated_field("interviewee")
-        self.interviewer = self._get_concatenated_field("interviewer")
-        self.personal_contributor = self._get_concatenated_field("personal_contributor")
-        self.corporate_contributor = self._get_concatenated_field(
-            "corporate_contributor"
-        )
-        self.personal_creator_valueURI = self._get_concatenated_field(
-            "personal_creator_valueURI"
-        )
-        self.corporate_creator_valueURI = self._get_concatenated_field(
-            "corporate_creator_valueURI"
-        )
-        self.interviewee_valueURI = self._get_concatenated_field("interviewee_valueURI")
-        self.interviewer_valueURI = self._get_concatenated_field("interviewer_valueURI")
-        self.personal_contributor_valueURI = self._get_concatenated_field(
-            "personal_contributor_valueURI"
-        )
-        self.corporate_contributor_valueURI = self._get_concatenated_field(
-            "corporate_contributor_valueURI"
-        )
-        self.description = md.get("description", "")
-        self.disclaimer = md.get("disclaimer", "")
-        self.table_of_contents = md.get("table_of_contents", "")
-        self.transcript = md.get("transcript", "")
-        self.annotation = md.get("annotation", "")
-        self.url = md.get("url", "")
-        self.language = self._get_concatenated_field("language")
-        self.topical_subject_lcsh = self._get_concatenated_field("topical_subject_lcsh")
-        self.topical_subject_fast = self._get_concatenated_field("topical_subject_fast")
-        self.topical_subject_local = self._get_concatenated_field(
-            "topical_subject_local"
-        )
-        self.geographic_subject_lcsh = self._get_concatenated_field(
-            "geographic_subject_lcsh"
-        )
-        self.geographic_subject_fast = self._get_concatenated_field(
-            "geographic_subject_fast"
-        )
-        self.geographic_subject_local = self._get_concatenated_field(
-            "geographic_subject_local"
-        )
-        self.geographic_subject_geonames = self._get_concatenated_field(
-            "geographic_subject_geonames"
-        )
-        self.coordinates = self._get_concatenated_field("coordinates")
-        self.personal_name_subject = self._get_concatenated_field(
-            "personal_name_subject"
-        )
-        self.corporate_name_subject = self._get_concatenated_field(
-            "corporate_name_subject"
-        )
-        self.birds_subject = self._get_concatenated_field("birds_subject")
-        self.event_subject = self._get_concatenated_field("event_subject")
-        self.topical_subject_lcsh_valueURI = self._get_concatenated_field(
-            "topical_subject_lcsh_valueURI"
-        )
-        self.topical_subject_fast_valueURI = self._get_concatenated_field(
-            "topical_subject_fast_valueURI"
-        )
-        self.topical_subject_local_valueURI = self._get_concatenated_field(
-            "topical_subject_local_valueURI"
-        )
-        self.geographic_subject_lcsh_valueURI = self._get_concatenated_field(
-            "geographic_subject_lcsh_valueURI"
-        )
-        self.geographic_subject_fast_valueURI = self._get_concatenated_field(
-            "geographic_subject_fast_valueURI"
-        )
-        self.geographic_subject_local_valueURI = self._get_concatenated_field(
-            "geographic_subject_local_valueURI"
-        )
-        self.geographic_subject_geonames_valueURI = self._get_concatenated_field(
-            "geographic_subject_geonames_valueURI"
-        )
-        self.personal_name_subject_valueURI = self._get_concatenated_field(
-            "personal_name_subject_valueURI"
-        )
-        self.corporate_name_subject_valueURI = self._get_concatenated_field(
-            "corporate_name_subject_valueURI"
-        )
-        self.birds_subject_valueURI = self._get_concatenated_field(
-            "birds_subject_valueURI"
-        )
-        self.event_subject_valueURI = self._get_concatenated_field(
-            "event_subject_valueURI"
-        )
-        self.chronological_subject = self._get_concatenated_field(
-            "chronological_subject"
-        )
-        self.extent = self._get_concatenated_field("extent")
-        self.aat_genre = self._get_concatenated_field("aat_genre")
-        self.aat_type = self._get_concatenated_field("aat_type")
-        self.dcmi_type = self._get_concatenated_field("dcmi_type")
-        self.aat_genre_valueURI = self._get_concatenated_field("aat_genre_valueURI")
-        self.aat_type_valueURI = self._get_concatenated_field("aat_type_valueURI")
-        self.dcmi_type_valueURI = self._get_concatenated_field("dcmi_type_valueURI")
-        self.type_of_resource = self._get_concatenated_field("type_of_resource")
-        self.imt_type = md.get("imt_type", "")
-        self.cco_description = md.get("cco_description", "")
-        self.rights_management = self._get_concatenated_field("rights_management")
-        self.rights_management_valueURI = self._get_concatenated_field(
-            "rights_management_valueURI"
-        )
-        self.date_original = md.get("date_original", "")
-        self.date_digital = md.get("date_digital", "")
-        self.place_of_origin = md.get("location_interview", "")
-        self.publisher = md.get("publisher", "")
-        self.publisher_valueURI = md.get("publisher_valueURI", "")
-        self.ark = md.get("ark", "")
-        self.local_id = md.get("local_id", "")
-        self.avian_id = md.get("avian_id", "")
-        self.uid = md.get("uid", "")
-        self.project_number = md.get("project_number", "")
-        self.file_name = md.get("file_name", "")
-        self.date_created = md.get("date_created", "")
-        self.date_modified = md.get("date_modified", "")
-        self.issuance = md.get("issuance", "")
-        self.issuance_start = md.get("issuance_start", "")
-        self.issuance_end = md.get("issuance_end", "")
-        self.frequency = md.get("frequency", "")
-        self.digital_collection = md.get("digital_collection", "")
-        self.digital_collection_ark = md.get("digital_collection_ark", "")
-        self.related_exhibit = md.get("related_exhibit", "")
-        self.related_exhibit_url = md.get("related_exhibit_url", "")
-        self.hardware_software = md.get("hardware_software", "")
-        self.reformatting_quality = md.get("reformatting_quality", "")
-        self.digital_origin = md.get("digital_origin", "")
-        self.image_manipulation = md.get("image_manipulation", "")
-        self.file_size = md.get("file_size", "")
-        self.resolution = md.get("resolution", "")
-        self.colorspace = md.get("colorspace", "")
-        self.bits_per_sample = md.get("bits_per_sample", "")
-        self.samples_per_pixel = md.get("samples_per_pixel", "")
-        self.height = md.get("height", "")
-        self.width = md.get("width", "")
-
-        self.dc_namespace = "http://purl.org/dc/elements/1.1/"
-        self.dc_nsmap = {"dc": "http://purl.org/dc/elements/1.1/"}
-        self.dc_E = ElementMaker(namespace=self.dc_namespace, nsmap=self.dc_nsmap)
-        self.dc_separator = "; "
-
-    def _get_concatenated_field(self, field):
-        return [m.strip() for m in self.md.get(field, "").split(";")]
+        # Copied from the module-level templates on the first to_mods()/to_dc().
+        self.mods_root = None
+        self.mods = None
+        self.dc_root = None
+        self.dc = None
+
+        for name, multi in CSV_COLUMNS:
+            value = md.get(name, "")
+            setattr(self, name, _split(value) if multi else value)
 
     def _list_not_empty(self, lst):
         return bool([x for x in lst if x != ""])
@@ -476,7 +635,7 @@ class CsvRow:
     def _mods_origin_info(self, update=True):
         if (
             self.publisher
-            or self.place_of_origin
+            or self.location_interview
             or self.date_original
             or self.date_digital
             or self.issuance
@@ -486,12 +645,15 @@ class CsvRow:
         ):
             origin_info = E.originInfo()
             if self.publisher:
-                origin_info.append(escape(self.publisher))
-            if self.place_of_origin:
+                publisher = E.publisher(escape(self.publisher))
+                if self.publisher_valueURI:
+                    publisher.attrib["valueURI"] = self.publisher_valueURI
+                origin_info.append(publisher)
+            if self.location_interview:
                 origin_info.append(
                     E.place(
                         E.placeTerm(
-                            escape(self.place_of_origin),
+                            escape(self.location_interview),
                             type="text",
                         )
                     )
@@ -517,20 +679,26 @@ class CsvRow:
                 origin_info.append(E.issuance(escape(self.issuance)))
             if self.issuance_start:
                 origin_info.append(
-                    escape(self.issuance_start),
-                    encoding="iso8601",
-                    point="start",
+                    E.dateIssued(
+                        escape(self.issuance_start),
+                        encoding="iso8601",
+                        point="start",
+                    )
                 )
             if self.issuance_end:
                 origin_info.append(
-                    escape(self.issuance_end),
-                    encoding="iso8601",
-                    point="end",
+                    E.dateIssued(
+                        escape(self.issuance_end),
+                        encoding="iso8601",
+                        point="end",
+                    )
                 )
             if self.frequency:
                 origin_info.append(
-                    escape(self.frequency),
-                    authority="marcfrequency",
+                    E.frequency(
+                        escape(self.frequency),
+                        authority="marcfrequency",
+                    )
                 )
 
             if update:
@@ -909,26 +1077,6 @@ class CsvRow:
             return output_items
         return None
 
-    def _dc_add_multiple_paired_fields(self, element, fields, update=True):
-        e = self.dc_E
-        output = []
-        for field in fields:
-            for pair in field:
-                item = e._makeelement(
-                    f"{{http://purl.org/dc/elements/1.1/}}{element}",
-                    nsmap=self.dc_nsmap,
-                )
-                if pair[1]:
-                    item.text = escape(self.dc_separator.join(pair))
-                else:
-                    item.text = escape(pair[0])
-                output.append(item)
-        if update:
-            for item in output:
-                self.dc.append(item)
-
-        return output
-
     def _dc_add_single_field(self, element, content, update=True):
         e = self.dc_E
         if content:
@@ -1026,9 +1174,7 @@ class CsvRow:
                 self.corporate_contributor, self.corporate_contributor_valueURI
             ),
         ]
-        return self._dc_add_multiple_paired_fields(
-            "contributor", contributor_bits, update
-        )
+        return self._dc_add_fields("contributor", contributor_bits, update)
 
     def _dc_date(self, update=True):
         return self._dc_add_single_field("date", self.date_original, update)
@@ -1110,6 +1256,8 @@ class CsvRow:
         return self._dc_add_multiple_single_fields("identifier", identifiers, update)
 
     def to_mods(self):
+        if self.mods_root is None:
+            self.mods_root = deepcopy(MODS_ROOT)
         self.mods = self.mods_root
         self._mods_object_title()
         self._mods_physical_collection()
@@ -1131,6 +1279,8 @@ class CsvRow:
         return self.mods
 
     def to_dc(self):
+        if self.dc_root is None:
+            self.dc_root = deepcopy(DC_ROOT)
         self.dc = self.dc_root
         self._dc_title()
         self._dc_source()
@@ -0,0 +1,192 @@
+"""Which records a CSV changes compared with an XML directory (isa diff)."""
+import argparse
+from collections import Counter
+import csv
+from functools import partial
+from hashlib import blake2b
+from pathlib import Path
+
+from lxml.etree import XMLSyntaxError
+
+from isa import archive
+from isa import csv2xml as c2x
+from isa import xml2csv as x2c
+from isa.columns import COLUMNS, HEADERS, select_columns
+
+MULTI = {name for name, multi in COLUMNS if multi}
+
+# Per column, 8 bytes is plenty to tell edited values apart; the row digest
+# decides whether the columns are looked at at all.
+COLUMN_DIGEST_SIZE = 8
+ROW_DIGEST_SIZE = 16
+# Most columns of most records are empty.
+EMPTY_DIGEST = blake2b(b"", digest_size=COLUMN_DIGEST_SIZE).digest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="isa diff")
+    parser.add_argument("csv")
+    parser.add_argument("xml")
+    parser.add_argument("--output")
+    parser.add_argument("--columns")
+    # The tree walk is the faster engine whenever every column is compared.
+    parser.add_argument("--engine", choices=x2c.ENGINES, default="walk")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--recursive", action="store_true")
+    args = parser.parse_args(argv)
+
+    header = c2x.csv_header(args.csv)
+    if "pid" not in header:
+        parser.error(f"{args.csv} has no pid column")
+    columns = [name for name in HEADERS if name in header]
+    if args.columns is not None:
+        try:
+            wanted = set(select_columns(args.columns))
+        except ValueError as e:
+            parser.error(str(e))
+        columns = [name for name in columns if name in wanted]
+    xml = Path(args.xml)
+    if not (xml.is_dir() or archive.is_archive(xml)):
+        parser.error(f"{args.xml} is not a directory or archive of XML files")
+
+    records, counts, column_counts = diff(
+        args.csv,
+        x2c.xml_sources(xml, recursive=args.recursive),
+        columns,
+        args.engine,
+        args.workers or None,
+        args.chunk_size,
+    )
+
+    print(
+        f"Records: {counts['unchanged']} unchanged, {counts['changed']} changed, "
+        f"{counts['csv only']} only in the CSV, {counts['xml only']} only in the XML"
+    )
+    for name in columns:
+        if column_counts[name]:
+            print(f"  {name:<40} {column_counts[name]:9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf8", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["pid", "status", "columns", "row", "file"])
+            for pid, status, names, row_number, source in records:
+                writer.writerow([pid, status, ";".join(names), row_number, source])
+    else:
+        for pid, status, names, _, _ in records:
+            print(f"{status:<9} {pid} {'; '.join(names)}")
+
+
+def diff(csv_path, sources, columns, engine="xpath", workers=None, chunk_size=64):
+    # Returns (pid, status, changed columns, CSV row number, XML file) for
+    # every record that isn't unchanged, how many records have each status,
+    # and how many records changed in each column.
+    # The CSV is read twice: once for a digest of each row, and again for
+    # the column digests of just the rows that didn't match.
+    csv_digests = {}
+    for md in c2x.iter_csv(csv_path):
+        csv_digests[md["pid"]] = row_digest(column_values(md.get, columns))
+
+    records = []
+    counts = Counter()
+    mismatched = {}
+    for pid, source, digest, packed in iter_digests(
+        sources, columns, engine, workers, chunk_size
+    ):
+        expected = csv_digests.pop(pid, None)
+        if expected is None:
+            records.append((pid, "xml only", [], "", source))
+            counts["xml only"] += 1
+        elif expected == digest:
+            counts["unchanged"] += 1
+        else:
+            mismatched[pid] = (source, packed)
+
+    column_counts = Counter()
+    for row_number, md in enumerate(c2x.iter_csv(csv_path), 1):
+        pid = md["pid"]
+        if pid in csv_digests:
+            records.append((pid, "csv only", [], row_number, ""))
+            counts["csv only"] += 1
+        elif pid in mismatched:
+            source, packed = mismatched.pop(pid)
+            values = column_values(md.get, columns)
+            names = changed_columns(column_digests(values), packed, columns)
+            column_counts.update(names)
+            records.append((pid, "changed", names, row_number, source))
+            counts["changed"] += 1
+
+    return records, counts, column_counts
+
+
+def iter_digests(sources, columns, engine="xpath", workers=None, chunk_size=64):
+    # (pid, file, row digest, column digests) for each XML record, hashed
+    # in worker processes so only digests come back.
+    chunks = x2c.map_chunks(
+        _digest_chunk, sources, (columns, engine), workers, chunk_size
+    )
+    for chunk, results in chunks:
+        yield from _finish_digests(chunk, results)
+
+
+def _digest_chunk(sources, columns, engine):
+    xpaths = None if len(columns) == len(HEADERS) else x2c.column_xpaths(columns)
+    results = []
+    for x in sources:
+        try:
+            md = x2c.XmlMD(x2c.parse_source(x), engine, xpaths=xpaths)
+        except XMLSyntaxError:
+            results.append(None)
+            continue
+        values = column_values(partial(getattr, md), columns)
+        results.append((md.pid, row_digest(values), column_digests(values)))
+
+    return results
+
+
+def _finish_digests(sources, results):
+    for x, result in zip(sources, results):
+        name = str(x2c.source_name(x))
+        if result is None:
+            print(f"Couldn't parse {name}! Skipping! Sorry!")
+        else:
+            pid, digest, packed = result
+            yield pid, name, digest, packed
+
+
+def column_values(get, columns):
+    # Spacing around ";" is the only difference between how xml2csv writes
+    # a value and how someone might type it back in.
+    values = []
+    for name in columns:
+        value = get(name) or ""
+        if value and name in MULTI:
+            value = ";".join(m.strip() for m in value.split(";"))
+        values.append(value)
+    return values
+
+
+def row_digest(values):
+    return blake2b(
+        "\x1f".join(values).encode("utf8"), digest_size=ROW_DIGEST_SIZE
+    ).digest()
+
+
+def column_digests(values):
+    # One COLUMN_DIGEST_SIZE digest per value, packed into one bytes.
+    return b"".join(
+        blake2b(value.encode("utf8"), digest_size=COLUMN_DIGEST_SIZE).digest()
+        if value
+        else EMPTY_DIGEST
+        for value in values
+    )
+
+
+def changed_columns(packed, other, columns):
+    size = COLUMN_DIGEST_SIZE
+    return [
+        name
+        for i, name in enumerate(columns)
+        if packed[i * size : (i + 1) * size] != other[i * size : (i + 1) * size]
+    ]
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+from isa.cache import digest
+
+# Bump when what's journaled changes so old journals are ignored.
+JOURNAL_VERSION = 1
+
+
+def journal_path(output_path):
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}.journal")
+
+
+def fingerprint(*settings):
+    # What a journal's entries depend on (input, output, options); a journal
+    # for a different run is started over rather than resumed.
+    return digest(json.dumps([JOURNAL_VERSION, *settings]).encode("utf8"))
+
+
+class Journal:
+    # Append-only record of finished inputs, one JSON list per line, so a run
+    # that's killed part way can carry on from its last checkpoint (see
+    # --resume). A line cut off by a crash is dropped when the journal is
+    # reopened.
+    def __init__(self, path, run):
+        self.path = Path(path)
+        self.header = (json.dumps({"journal": run}) + "\n").encode("utf8")
+        self.start = len(self.header)
+        self.end = self._scan() if self.path.exists() else 0
+        self.fh = None
+        if self.end == 0:
+            print(f"Starting journal {self.path}")
+        else:
+            print(f"Resuming from {self.path}")
+
+    def _scan(self):
+        # Length of the header and the complete entries after it, or 0 when
+        # the journal belongs to another run.
+        with open(self.path, "rb") as fh:
+            if fh.readline() != self.header:
+                return 0
+            end = self.start
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                end += len(line)
+        return end
+
+    def replay(self):
+        # (offset, entry) for each entry from the previous run; truncate(offset)
+        # drops it and everything after it.
+        if self.end == 0:
+            return
+        with open(self.path, "rb") as fh:
+            fh.seek(self.start)
+            offset = self.start
+            while offset < self.end:
+                line = fh.readline()
+                yield offset, json.loads(line)
+                offset += len(line)
+
+    def truncate(self, offset):
+        self.end = max(offset, self.start) if self.end else 0
+
+    def record(self, *entry):
+        if self.fh is None:
+            self._open()
+        self.fh.write((json.dumps(entry) + "\n").encode("utf8"))
+
+    def _open(self):
+        if self.end == 0:
+            self.fh = open(self.path, "wb")
+            self.fh.write(self.header)
+        else:
+            self.fh = open(self.path, "r+b")
+            self.fh.truncate(self.end)
+            self.fh.seek(self.end)
+
+    def checkpoint(self):
+        # Everything recorded so far survives the process dying. Not fsynced:
+        # this is for crashes, OOM kills and Ctrl-C, not power loss.
+        if self.fh is None:
+            self._open()
+        self.fh.flush()
+
+    def close(self):
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+    def finish(self):
+        # The run completed, so there's nothing to resume.
+        self.close()
+        self.path.unlink(missing_ok=True)
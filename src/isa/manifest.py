@@ -0,0 +1,100 @@
+import json
+import os
+from pathlib import Path
+
+from isa.cache import digest
+from isa.columns import COLUMNS, INGEST_COLUMNS
+
+MANIFEST_NAME = ".isa-manifest.json"
+
+# Bump when CsvRow starts building something differently so every row is
+# regenerated.
+MANIFEST_VERSION = 2
+
+
+def row_digest(md):
+    # Hash of the values CsvRow reads, normalized the way it reads them, so
+    # whitespace around ";" or columns it ignores don't count as changes.
+    values = []
+    for name, multi in COLUMNS + INGEST_COLUMNS:
+        value = md.get(name, "")
+        if multi:
+            value = ";".join(m.strip() for m in value.split(";"))
+        values.append(value)
+
+    return digest("\x1f".join(values).encode("utf8"))
+
+
+class Manifest:
+    def __init__(self, output_folder, rebuild=False):
+        self.path = Path(output_folder, MANIFEST_NAME)
+        # pid -> [row digest, {file name: [file digest, size, mtime_ns]}]
+        self.rows = {}
+        if self.path.exists() and not rebuild:
+            with open(self.path, encoding="utf8") as fh:
+                manifest = json.load(fh)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.rows = manifest["rows"]
+
+        self.seen = set()
+        self.added = 0
+        self.changed = 0
+        self.restored = 0
+        self.unchanged = 0
+
+    def needs_write(self, md, paths):
+        # paths are the files the row is written to. A row whose values are
+        # unchanged is still rewritten if one of its files has gone missing
+        # or was edited since it was written.
+        pid = md.get("pid", "")
+        row = row_digest(md)
+        self.seen.add(pid)
+
+        entry = self.rows.get(pid)
+        if entry is None:
+            self.added += 1
+        elif entry[0] != row:
+            self.changed += 1
+        elif all(_intact(p, entry[1].get(p.name)) for p in paths):
+            self.unchanged += 1
+            return False
+        else:
+            self.restored += 1
+        # Files are added back as they're written, so a row that fails part
+        # way through is regenerated next time.
+        self.rows[pid] = [row, {}]
+        return True
+
+    def wrote(self, pid, path, file_digest):
+        stat = os.stat(path)
+        self.rows[pid][1][path.name] = [file_digest, stat.st_size, stat.st_mtime_ns]
+
+    def removed(self):
+        return sorted(pid for pid in self.rows if pid not in self.seen)
+
+    def save(self):
+        # Rows no longer in the CSV are dropped; their files are left alone.
+        for pid in self.removed():
+            del self.rows[pid]
+
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp, "w", encoding="utf8") as fh:
+            json.dump({"version": MANIFEST_VERSION, "rows": self.rows}, fh)
+        os.replace(tmp, self.path)
+
+
+def _intact(path, written):
+    # Whether path still holds what the manifest says was written to it. The
+    # file is only read when its size matches but its mtime doesn't.
+    if written is None:
+        return False
+    file_digest, size, mtime_ns = written
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    return digest(path.read_bytes()) == file_digest
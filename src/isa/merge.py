@@ -0,0 +1,304 @@
+"""Patching existing MODS records from an edited CSV (csv2xml --merge)."""
+from pathlib import Path
+
+from lxml import etree
+
+from isa import csv2xml as c2x
+from isa import diff
+from isa import xml2csv as x2c
+from isa.cache import digest
+
+MODS_NAMESPACE = "http://www.loc.gov/mods/v3"
+NS = {"mods": MODS_NAMESPACE}
+PARSER = etree.XMLParser(remove_blank_text=True)
+
+# (CsvRow method, the columns it reads, the top-level elements of a record
+# it builds). A group is only rebuilt when the CSV has a value for one of
+# its columns that differs from what xml2csv reads from the record, the
+# same comparison isa diff makes; elements no group claims are never
+# touched. CsvRow doesn't build everything xml2csv reads (valueURIs on
+# some subjects, box and folder items, ...), so groups nobody edited are
+# left as they are rather than compared with what CsvRow would build.
+MODS_GROUPS = (
+    ("_mods_object_title", ("title",), "mods:titleInfo[not(@type)]"),
+    (
+        "_mods_physical_collection",
+        (
+            "archival_call_number",
+            "archival_collection",
+            "finding_aid_ark",
+            "physical_location",
+            "archival_series_title",
+            "folder_title",
+            "box",
+            "folder",
+        ),
+        "mods:relatedItem[@type='original']",
+    ),
+    (
+        "_mods_digital_collection",
+        ("digital_collection", "digital_collection_ark"),
+        "mods:relatedItem[@type='host']",
+    ),
+    (
+        "_mods_digital_exhibit",
+        ("related_exhibit", "related_exhibit_url"),
+        "mods:relatedItem[@type='isReferencedBy']",
+    ),
+    (
+        "_mods_contributing_institution",
+        ("contributing_institution", "contributing_institution_valueURI"),
+        "mods:name[mods:role/mods:roleTerm = 'curator']",
+    ),
+    (
+        "_mods_creators_contributors",
+        (
+            "personal_creator",
+            "personal_creator_valueURI",
+            "corporate_creator",
+            "corporate_creator_valueURI",
+            "interviewee",
+            "interviewee_valueURI",
+            "interviewer",
+            "interviewer_valueURI",
+            "personal_contributor",
+            "personal_contributor_valueURI",
+            "corporate_contributor",
+            "corporate_contributor_valueURI",
+        ),
+        "mods:name[mods:role/mods:roleTerm[. = 'creator' or . = 'interviewee'"
+        " or . = 'interviewer' or . = 'contributor']]",
+    ),
+    (
+        "_mods_origin_info",
+        (
+            "publisher",
+            "publisher_valueURI",
+            "location_interview",
+            "date_original",
+            "date_digital",
+            "issuance",
+            "issuance_start",
+            "issuance_end",
+            "frequency",
+        ),
+        "mods:originInfo",
+    ),
+    (
+        "_mods_notes",
+        ("description", "disclaimer", "annotation", "table_of_contents"),
+        "mods:abstract | mods:note[@type = 'disclaimer' or @type = 'annotation']"
+        " | mods:tableOfContents",
+    ),
+    ("_mods_language", ("language",), "mods:language"),
+    ("_mods_url", ("url",), "mods:location[mods:url]"),
+    (
+        "_mods_subjects",
+        (
+            "topical_subject_lcsh",
+            "topical_subject_lcsh_valueURI",
+            "topical_subject_fast",
+            "topical_subject_fast_valueURI",
+            "topical_subject_local",
+            "topical_subject_local_valueURI",
+            "birds_subject",
+            "birds_subject_valueURI",
+            "personal_name_subject",
+            "personal_name_subject_valueURI",
+            "corporate_name_subject",
+            "corporate_name_subject_valueURI",
+            "event_subject",
+            "event_subject_valueURI",
+            "chronological_subject",
+        ),
+        # CsvRow doesn't build geographic subjects, so those are left be.
+        "mods:subject[not(mods:geographic)]",
+    ),
+    (
+        "_mods_genre_type",
+        (
+            "aat_genre",
+            "aat_genre_valueURI",
+            "aat_type",
+            "aat_type_valueURI",
+            "cco_description",
+            "dcmi_type",
+            "dcmi_type_valueURI",
+            "type_of_resource",
+            "imt_type",
+        ),
+        "mods:genre[@authority = 'aat' or @authority = 'cco' or @authority = 'dct'"
+        " or @authority = 'imt'] | mods:typeOfResource",
+    ),
+    (
+        "_mods_rights",
+        ("rights_management", "rights_management_valueURI"),
+        "mods:accessCondition",
+    ),
+    ("_mods_record_info", ("date_created", "date_modified"), "mods:recordInfo"),
+    (
+        "_mods_physical_description",
+        (
+            "extent",
+            "digital_origin",
+            "image_manipulation",
+            "bits_per_sample",
+            "samples_per_pixel",
+            "colorspace",
+            "resolution",
+            "file_size",
+            "height",
+            "width",
+            "hardware_software",
+        ),
+        "mods:physicalDescription | mods:note[@type = 'hardware/software']",
+    ),
+    (
+        "_mods_identifiers",
+        ("ark", "local_id", "avian_id", "uid", "project_number", "file_name", "pid"),
+        "mods:identifier[not(@type) or @type = 'ark' or @type = 'local'"
+        " or @type = 'avian-id' or @type = 'uid' or @type = 'project-number'"
+        " or @type = 'islandora']",
+    ),
+)
+
+GROUPS = [
+    (method, columns, etree.XPath(owned, namespaces=NS))
+    for method, columns, owned in MODS_GROUPS
+]
+
+
+def save_xml_merged(mds, output_folder="", generate_dc=False, layout=None):
+    # Like csv2xml.save_xml_stream, but each row's existing MODS file is
+    # patched rather than rebuilt, and left alone when nothing in it would
+    # change. Rows without a file get a new one. Returns (added, patched,
+    # unchanged) row counts.
+    counts = {"added": 0, "patched": 0, "unchanged": 0}
+    for _, md, folder in c2x.rows_to_write(mds, output_folder, layout=layout):
+        status, _ = merge_row(md, folder, generate_dc)
+        counts[status] += 1
+
+    return counts["added"], counts["patched"], counts["unchanged"]
+
+
+def merge_rows(rows, generate_dc):
+    # merge_row for a chunk of (row number, md, folder), in the shape
+    # csv2xml.save_xml_parallel expects from its save_rows.
+    written = []
+    failed = []
+    for row_number, md, output_folder in rows:
+        try:
+            _, row_written = merge_row(md, output_folder, generate_dc)
+            written.extend(row_written)
+        except Exception as e:
+            failed.append((row_number, md.get("pid", ""), f"{type(e).__name__}: {e}"))
+
+    return len(rows), written, failed
+
+
+def merge_row(md, output_folder, generate_dc=False):
+    # Returns "added", "patched" or "unchanged", and (pid, file name,
+    # digest) for each file written.
+    pid = md.get("pid", "")
+    path = Path(output_folder, c2x.xml_file_name(pid, "mods"))
+    if not path.exists():
+        x = c2x.CsvRow(md)
+        written = []
+        for schema in ("mods", "dc") if generate_dc else ("mods",):
+            file_name, data = c2x.write_xml(x, schema, output_folder)
+            written.append((pid, file_name, digest(data)))
+        return "added", written
+
+    record = etree.parse(str(path), PARSER).getroot()
+    groups = changed_groups(md, record)
+    md = _fill_missing(md, record)
+    x = c2x.CsvRow(md)
+    written = []
+    if groups and merge_mods(x, record, groups):
+        data = c2x.serialize(record)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        written.append((pid, path.name, digest(data)))
+
+    if generate_dc:
+        # DC is derived from the row as a whole, so it's rebuilt, and only
+        # written when it comes out different.
+        file_name, data = c2x.build_xml(x, "dc")
+        dc_path = Path(output_folder, file_name)
+        if not dc_path.exists() or dc_path.read_bytes() != data:
+            with open(dc_path, "wb") as fh:
+                fh.write(data)
+            written.append((pid, file_name, digest(data)))
+
+    return ("patched" if written else "unchanged"), written
+
+
+def changed_groups(md, record):
+    # Indexes into GROUPS of the groups with a column whose value in md
+    # isn't what xml2csv reads from record.
+    columns = [name for _, names, _ in GROUPS for name in names if name in md]
+    current = x2c.XmlMD(record, xpaths=x2c.column_xpaths(columns))
+    old = diff.column_values(lambda name: getattr(current, name, ""), columns)
+    new = diff.column_values(md.get, columns)
+    changed = {name for name, a, b in zip(columns, old, new) if a != b}
+    return [i for i, (_, names, _) in enumerate(GROUPS) if changed.intersection(names)]
+
+
+def _fill_missing(md, record):
+    # Columns a partial CSV doesn't have are read back from the record, for
+    # the groups that mix them with columns it does have.
+    missing = {
+        name
+        for _, columns, _ in GROUPS
+        if any(name in md for name in columns)
+        for name in columns
+        if name not in md
+    }
+    if not missing:
+        return md
+
+    current = x2c.XmlMD(record, xpaths=x2c.column_xpaths(missing))
+    filled = dict(md)
+    for name in missing:
+        filled[name] = getattr(current, name, "")
+    return filled
+
+
+def merge_mods(x, record, groups):
+    # Swaps the elements of the given groups (see changed_groups) in record
+    # for the ones x builds, in place, where the old ones were (or where
+    # to_mods() would have put them). Returns whether anything changed.
+    # A round trip through serialize() puts CsvRow's elements in the MODS
+    # namespace the way they'd be read back from a file.
+    built = etree.fromstring(c2x.serialize(x.to_mods()), PARSER)
+    changed = False
+    for i in groups:
+        owned = GROUPS[i][2]
+        old = owned(record)
+        new = owned(built)
+        if [_c14n(el) for el in old] == [_c14n(el) for el in new]:
+            continue
+
+        if old:
+            position = record.index(old[0])
+        else:
+            position = _position_after(record, i)
+        for el in old:
+            record.remove(el)
+        for offset, el in enumerate(new):
+            record.insert(position + offset, el)
+        changed = True
+
+    return changed
+
+
+def _position_after(record, group):
+    # Index of the first element belonging to a group after this one.
+    later = [
+        record.index(el) for _, _, owned in GROUPS[group + 1 :] for el in owned(record)
+    ]
+    return min(later, default=len(record))
+
+
+def _c14n(el):
+    return etree.tostring(el, method="c14n", exclusive=True, with_tail=False)
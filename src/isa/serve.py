@@ -0,0 +1,239 @@
+"""Conversions over HTTP, so callers skip Python and lxml startup (isa serve)."""
+import argparse
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import json
+import os
+import signal
+import socket
+import socketserver
+from urllib.parse import parse_qs, urlsplit
+
+from lxml import etree
+
+from isa import csv2xml as c2x
+from isa import xml2csv as x2c
+from isa.columns import HEADERS, select_columns
+
+# Requests may come from anything on the machine, so entities aren't
+# expanded (no reading local files through a DOCTYPE).
+PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+MAX_BODY = 64 * 1024 * 1024
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="isa serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket")
+    parser.add_argument("--engine", choices=x2c.ENGINES, default="xpath")
+    parser.add_argument("--max-body", type=int, default=MAX_BODY)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.socket:
+        server = make_server(socket_path=args.socket, engine=args.engine)
+        print(f"Serving on {args.socket}")
+    else:
+        server = make_server((args.host, args.port), engine=args.engine)
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port}")
+    server.max_body = args.max_body
+    server.verbose = args.verbose
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        server.server_close()
+        if args.socket:
+            os.unlink(args.socket)
+
+
+def make_server(address=("127.0.0.1", 8765), socket_path=None, engine="xpath"):
+    # A threaded server for Handler on a TCP address, or on a Unix socket
+    # when socket_path is given. Call serve_forever() to start it.
+    if socket_path is None:
+        server = ThreadingHTTPServer(address, Handler)
+    else:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, Handler)
+    server.engine = engine
+    server.max_body = MAX_BODY
+    server.verbose = False
+    return server
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+    # POST /mods/row   MODS XML -> {column: value}
+    # POST /mods/rows  [MODS XML, ...] -> [{column: value} or {"error": ...}]
+    # POST /row/mods   {column: value} -> MODS XML
+    # POST /rows/mods  [{column: value}, ...] -> [MODS XML or {"error": ...}]
+    # POST /row/dc, /rows/dc  the same for DC
+    # GET  /health, /columns
+    # /mods/row and /mods/rows take ?columns= as isa --columns does.
+    protocol_version = "HTTP/1.1"
+    server_version = "isa"
+    # Small responses go out in one write, flushed after each request.
+    wbufsize = -1
+
+    def setup(self):
+        # Larger ones are written as headers and then body, which Nagle would
+        # hold back until the client's delayed ACK (tens of ms per request on
+        # a keep-alive connection). Unix sockets have no Nagle to turn off.
+        self.disable_nagle_algorithm = self.server.address_family != socket.AF_UNIX
+        super().setup()
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/columns":
+            self._send_json(200, list(HEADERS))
+        else:
+            self._send_json(404, {"error": f"No such endpoint: {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path)
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self.close_connection = True
+            self._send_json(411, {"error": "Content-Length is required"})
+            return
+        if int(length) > self.server.max_body:
+            self.close_connection = True
+            self._send_json(413, {"error": f"Body over {self.server.max_body} bytes"})
+            return
+        body = self.rfile.read(int(length))
+        if route is None:
+            self._send_json(404, {"error": f"No such endpoint: {url.path}"})
+            return
+
+        try:
+            selected = _columns(parse_qs(url.query).get("columns", [None])[0])
+            content_type, data = route(body, selected, self.server.engine)
+        except (ValueError, SyntaxError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send(200, content_type, data)
+
+    def _send_json(self, status, value):
+        self._send(status, "application/json", _dumps(value))
+
+    def _send(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def address_string(self):
+        # Unix socket clients have no address.
+        return self.client_address[0] if self.client_address else "local"
+
+
+@lru_cache(maxsize=32)
+def _columns(spec):
+    # (columns, their XPaths) for a ?columns= value; (HEADERS, None) without.
+    if spec is None:
+        return HEADERS, None
+    columns = select_columns(spec)
+    return columns, x2c.column_xpaths(columns)
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf8")
+
+
+def _load_json(body, kind):
+    value = json.loads(body)
+    if not isinstance(value, kind):
+        raise ValueError(f"Expected a JSON {'array' if kind is list else 'object'}")
+    return value
+
+
+def _mods_to_row(data, selected, engine):
+    if isinstance(data, str):
+        data = data.encode("utf8")
+    elif not isinstance(data, bytes):
+        raise ValueError("Expected MODS XML as a string")
+    names, xpaths = selected
+    md = x2c.XmlMD(etree.parse(BytesIO(data), PARSER), engine, xpaths=xpaths)
+    return {name: getattr(md, name) for name in names}
+
+
+def _row_to_xml(row, schema):
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object")
+    md = {str(k): "" if v is None else str(v) for k, v in row.items()}
+    x = c2x.CsvRow(md)
+    return c2x.serialize(x.to_mods() if schema == "mods" else x.to_dc())
+
+
+def _batch(items, convert):
+    # One item's bad input doesn't fail the others.
+    results = []
+    for item in items:
+        try:
+            results.append(convert(item))
+        except (ValueError, SyntaxError) as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def mods_row(body, selected, engine):
+    return "application/json", _dumps(_mods_to_row(body, selected, engine))
+
+
+def mods_rows(body, selected, engine):
+    records = _load_json(body, list)
+    rows = _batch(records, lambda record: _mods_to_row(record, selected, engine))
+    return "application/json", _dumps(rows)
+
+
+def row_mods(body, selected, engine):
+    return "application/xml", _row_to_xml(_load_json(body, dict), "mods")
+
+
+def rows_mods(body, selected, engine):
+    rows = _load_json(body, list)
+    records = _batch(rows, lambda row: _row_to_xml(row, "mods").decode("utf8"))
+    return "application/json", _dumps(records)
+
+
+def row_dc(body, selected, engine):
+    return "application/xml", _row_to_xml(_load_json(body, dict), "dc")
+
+
+def rows_dc(body, selected, engine):
+    rows = _load_json(body, list)
+    records = _batch(rows, lambda row: _row_to_xml(row, "dc").decode("utf8"))
+    return "application/json", _dumps(records)
+
+
+ROUTES = {
+    "/mods/row": mods_row,
+    "/mods/rows": mods_rows,
+    "/row/mods": row_mods,
+    "/rows/mods": rows_mods,
+    "/row/dc": row_dc,
+    "/rows/dc": rows_dc,
+}
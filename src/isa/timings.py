@@ -0,0 +1,111 @@
+from contextlib import nullcontext
+import json
+import time
+
+
+class Timings:
+    # Wall time, CPU time and item counts per stage. Stages nest, and each
+    # one is only charged for the time not spent in the stages inside it, so
+    # a generator pulling from another generator doesn't count its source's
+    # work as its own.
+    def __init__(self):
+        self.stages = {}
+        self.stack = []
+        self.start = (time.perf_counter(), time.process_time())
+
+    def stage(self, name, items=1):
+        return _Stage(self, name, items)
+
+    def iterate(self, name, iterable):
+        # Charges each next() on iterable to the stage, one item per value.
+        iterator = iter(iterable)
+        while True:
+            self._enter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                self._exit(name, 0)
+                return
+            except BaseException:
+                self._exit(name, 0)
+                raise
+            self._exit(name, 1)
+            yield value
+
+    def _enter(self):
+        self.stack.append([time.perf_counter(), time.process_time(), 0.0, 0.0])
+
+    def _exit(self, name, items):
+        wall, cpu, child_wall, child_cpu = self.stack.pop()
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+        totals[0] += wall - child_wall
+        totals[1] += cpu - child_cpu
+        totals[2] += items
+        if self.stack:
+            self.stack[-1][2] += wall
+            self.stack[-1][3] += cpu
+
+    def totals(self):
+        return (
+            time.perf_counter() - self.start[0],
+            time.process_time() - self.start[1],
+        )
+
+    def report(self):
+        wall, cpu = self.totals()
+        lines = [
+            f"{'stage':<20} {'wall s':>9} {'cpu s':>9} {'items':>9} {'ms/item':>9}"
+        ]
+        for name, (stage_wall, stage_cpu, items) in self.stages.items():
+            per_item = f"{1000 * stage_wall / items:9.3f}" if items else f"{'':9}"
+            lines.append(
+                f"{name:<20} {stage_wall:9.3f} {stage_cpu:9.3f} {items:9} {per_item}"
+            )
+        lines.append(f"{'total':<20} {wall:9.3f} {cpu:9.3f}")
+        return "\n".join(lines)
+
+    def save_json(self, path):
+        wall, cpu = self.totals()
+        with open(path, "w", encoding="utf8") as fh:
+            json.dump(
+                {
+                    "wall": wall,
+                    "cpu": cpu,
+                    "stages": {
+                        name: {"wall": stage_wall, "cpu": stage_cpu, "items": items}
+                        for name, (stage_wall, stage_cpu, items) in self.stages.items()
+                    },
+                },
+                fh,
+                indent=2,
+            )
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "items")
+
+    def __init__(self, timings, name, items):
+        self.timings = timings
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.timings._enter()
+
+    def __exit__(self, *exc):
+        self.timings._exit(self.name, self.items)
+
+
+class _Off:
+    # Stands in for Timings when timing is off.
+    def stage(self, name, items=1):
+        return NULL_STAGE
+
+    def iterate(self, name, iterable):
+        return iterable
+
+
+NULL_STAGE = nullcontext()
+OFF = _Off()
@@ -0,0 +1,413 @@
+"""Single-pass alternative to the XPath registry in xml2csv.
+
+Every top-level child of <mods:mods> is visited exactly once and
+dispatched on its tag and type/authority attribute into column buckets.
+The buckets reproduce the semantics of the XPath expressions in
+xml2csv.FIELDS: single-valued columns keep the string value of the first
+match in document order, joined columns collect every matching text node
+or @valueURI.
+"""
+from collections import defaultdict
+
+MODS = "{http://www.loc.gov/mods/v3}"
+
+ABSTRACT = MODS + "abstract"
+ACCESS_CONDITION = MODS + "accessCondition"
+COORDINATES = MODS + "coordinates"
+DATE_CAPTURED = MODS + "dateCaptured"
+DATE_CREATED = MODS + "dateCreated"
+DATE_ISSUED = MODS + "dateIssued"
+DIGITAL_ORIGIN = MODS + "digitalOrigin"
+EXTENT = MODS + "extent"
+FREQUENCY = MODS + "frequency"
+GENRE = MODS + "genre"
+GEOGRAPHIC = MODS + "geographic"
+IDENTIFIER = MODS + "identifier"
+ISSUANCE = MODS + "issuance"
+LANGUAGE = MODS + "language"
+LANGUAGE_TERM = MODS + "languageTerm"
+LOCATION = MODS + "location"
+NAME = MODS + "name"
+NAME_PART = MODS + "namePart"
+NOTE = MODS + "note"
+ORIGIN_INFO = MODS + "originInfo"
+PHYSICAL_DESCRIPTION = MODS + "physicalDescription"
+PHYSICAL_LOCATION = MODS + "physicalLocation"
+PLACE = MODS + "place"
+PLACE_TERM = MODS + "placeTerm"
+PUBLISHER = MODS + "publisher"
+RECORD_CHANGE_DATE = MODS + "recordChangeDate"
+RECORD_CREATION_DATE = MODS + "recordCreationDate"
+RECORD_INFO = MODS + "recordInfo"
+RELATED_ITEM = MODS + "relatedItem"
+ROLE = MODS + "role"
+ROLE_TERM = MODS + "roleTerm"
+ROOT = MODS + "mods"
+SUBJECT = MODS + "subject"
+TABLE_OF_CONTENTS = MODS + "tableOfContents"
+TEMPORAL = MODS + "temporal"
+TITLE = MODS + "title"
+TITLE_INFO = MODS + "titleInfo"
+TOPIC = MODS + "topic"
+TYPE_OF_RESOURCE = MODS + "typeOfResource"
+URL = MODS + "url"
+
+IDENTIFIER_TYPES = {
+    "islandora": "pid",
+    "ark": "ark",
+    "local": "local_id",
+    "uid": "uid",
+    "avian-id": "avian_id",
+    "project-number": "project_number",
+}
+NOTE_TYPES = {
+    "annotation": "annotation",
+    "hardware/software": "hardware_software",
+    "Disclaimer": "disclaimer",
+}
+PHYSICAL_NOTE_TYPES = {
+    "image-manipulation": "image_manipulation",
+    "file-size": "file_size",
+    "resolution": "resolution",
+    "colorspace": "colorspace",
+    "bits-per-sample": "bits_per_sample",
+    "samples-per-pixel": "samples_per_pixel",
+    "height": "height",
+    "width": "width",
+}
+TOPIC_AUTHORITIES = {
+    "fast": "topical_subject_fast",
+    "lcsh": "topical_subject_lcsh",
+    "local": "topical_subject_local",
+    "gbif": "birds_subject",
+    None: "event_subject",
+}
+GEOGRAPHIC_AUTHORITIES = {
+    "fast": "geographic_subject_fast",
+    "lcsh": "geographic_subject_lcsh",
+    "local": "geographic_subject_local",
+    "geonames": "geographic_subject_geonames",
+}
+NAME_SUBJECT_TYPES = {
+    "personal": "personal_name_subject",
+    "corporate": "corporate_name_subject",
+}
+# (name/@type, roleTerm) -> (namePart column, whether only the first text counts)
+NAME_ROLES = {
+    ("personal", "creator"): ("personal_creator", False),
+    ("corporate", "creator"): ("corporate_creator", False),
+    ("personal", "interviewee"): ("interviewee", True),
+    ("personal", "interviewer"): ("interviewer", True),
+    ("personal", "contributor"): ("personal_contributor", False),
+    ("corporate", "contributor"): ("corporate_contributor", False),
+}
+NAME_ROLE_TERMS = {"curator"} | {role for _, role in NAME_ROLES}
+
+
+def _texts(el):
+    # The text() children of an element: its text plus the tail of each child.
+    texts = [] if el.text is None else [el.text]
+    texts.extend(child.tail for child in el if child.tail is not None)
+    return texts
+
+
+def _string(el):
+    # XPath string(): the concatenated descendant text of the element.
+    if not len(el):
+        return el.text or ""
+    return "".join(el.itertext())
+
+
+class _Buckets:
+    def __init__(self):
+        self.first = {}
+        self.many = defaultdict(list)
+
+    def set(self, column, el):
+        if column not in self.first:
+            self.first[column] = _string(el)
+
+    def set_first_text(self, column, el):
+        # string(.../text()): the first text node, not the full string value.
+        if column not in self.first:
+            texts = _texts(el)
+            if texts:
+                self.first[column] = texts[0]
+
+    def add(self, column, el, uri_column=None):
+        self.many[column].extend(_texts(el))
+        if uri_column is not None:
+            uri = el.get("valueURI")
+            if uri is not None:
+                self.many[uri_column].append(uri)
+
+    def set_path(self, column, el, *tags):
+        # First element at el/tag[0]/tag[1]/..., in document order.
+        if column in self.first:
+            return
+        if not tags:
+            self.set(column, el)
+            return
+        for child in el.iterchildren(tags[0]):
+            self.set_path(column, child, *tags[1:])
+            if column in self.first:
+                return
+
+
+def extract(md):
+    """Return (first, many) column buckets for a parsed MODS document.
+
+    ``first`` maps single-valued columns to their string value and
+    ``many`` maps joined columns to the list of values to join.
+    """
+    root = md.getroot() if hasattr(md, "getroot") else md
+    buckets = _Buckets()
+    is_mods = root.tag == ROOT
+
+    for child in root:
+        tag = child.tag
+        # mods:language and mods:mods/mods:accessCondition/@valueURI are
+        # relative to the root element rather than anchored at /mods:mods.
+        if tag == LANGUAGE:
+            for term in child.iterchildren(LANGUAGE_TERM):
+                buckets.add("language", term)
+        elif tag == ROOT:
+            for access in child.iterchildren(ACCESS_CONDITION):
+                uri = access.get("valueURI")
+                if uri is not None:
+                    buckets.many["rights_management_valueURI"].append(uri)
+        elif not is_mods:
+            continue
+        else:
+            handler = HANDLERS.get(tag)
+            if handler is not None:
+                handler(buckets, child)
+
+    return buckets.first, buckets.many
+
+
+def _identifier(buckets, el):
+    if not el.attrib:
+        buckets.set("file_name", el)
+    column = IDENTIFIER_TYPES.get(el.get("type"))
+    if column is not None:
+        buckets.set(column, el)
+
+
+def _title_info(buckets, el):
+    buckets.set_path("title", el, TITLE)
+
+
+def _related_item(buckets, el):
+    kind = el.get("type")
+    if kind == "original":
+        for child in el:
+            tag = child.tag
+            if tag == IDENTIFIER:
+                if child.get("displayLabel") == "Call Number":
+                    buckets.set("archival_call_number", child)
+                if child.get("type") == "ark":
+                    buckets.set("finding_aid_ark", child)
+            elif tag == TITLE_INFO:
+                buckets.set_path("archival_collection", child, TITLE)
+            elif tag == LOCATION:
+                buckets.set_path("physical_location", child, PHYSICAL_LOCATION)
+            elif tag == RELATED_ITEM:
+                _archival_related_item(buckets, child)
+    elif kind == "host":
+        for child in el:
+            if child.tag == TITLE_INFO:
+                buckets.set_path("digital_collection", child, TITLE)
+            elif child.tag == IDENTIFIER and child.get("type") == "ark":
+                buckets.set("digital_collection_ark", child)
+    elif kind == "isReferencedBy":
+        for child in el:
+            if child.tag == TITLE_INFO:
+                buckets.set_path("related_exhibit", child, TITLE)
+            elif child.tag == IDENTIFIER:
+                buckets.set("related_exhibit_url", child)
+
+
+def _archival_related_item(buckets, el):
+    kind = el.get("type")
+    if kind == "series":
+        outer, inner = "archival_series_title", "folder_title"
+    elif kind == "constituent":
+        outer, inner = "box", "folder"
+    else:
+        return
+    for child in el:
+        if child.tag == TITLE_INFO:
+            buckets.set_path(outer, child, TITLE)
+        elif child.tag == RELATED_ITEM and child.get("type") == "constituent":
+            buckets.set_path(inner, child, TITLE_INFO, TITLE)
+
+
+def _role_terms(role):
+    return {text for term in role.iterchildren(ROLE_TERM) for text in _texts(term)}
+
+
+def _name(buckets, el):
+    kind = el.get("type")
+    uri = el.get("valueURI")
+
+    # namePart columns look at the roles *following* each namePart, while
+    # the @valueURI columns look at every role of the name.
+    parts = []
+    following = set()
+    for child in reversed(el):
+        if child.tag == ROLE:
+            following |= _role_terms(child)
+        elif child.tag == NAME_PART:
+            parts.append((child, following & NAME_ROLE_TERMS))
+    parts.reverse()
+    roles = following
+
+    for part, part_roles in parts:
+        if "curator" in part_roles:
+            buckets.set("contributing_institution", part)
+        for role in part_roles:
+            column = NAME_ROLES.get((kind, role))
+            if column is None:
+                continue
+            column, first_only = column
+            if first_only:
+                buckets.set_first_text(column, part)
+            else:
+                buckets.add(column, part)
+
+    if uri is None:
+        return
+    if "curator" in roles:
+        buckets.first.setdefault("contributing_institution_valueURI", uri)
+    for role in roles & NAME_ROLE_TERMS:
+        column = NAME_ROLES.get((kind, role))
+        if column is None:
+            continue
+        column, first_only = column
+        column += "_valueURI"
+        if first_only:
+            buckets.first.setdefault(column, uri)
+        else:
+            buckets.many[column].append(uri)
+
+
+def _subject(buckets, el):
+    authority = el.get("authority")
+    for child in el:
+        tag = child.tag
+        if tag == TOPIC:
+            column = TOPIC_AUTHORITIES.get(authority)
+            if column is not None:
+                buckets.add(column, child, column + "_valueURI")
+        elif tag == GEOGRAPHIC:
+            column = GEOGRAPHIC_AUTHORITIES.get(authority)
+            if column is not None:
+                buckets.add(column, child, column + "_valueURI")
+            for coordinates in child.iterchildren(COORDINATES):
+                buckets.add("coordinates", coordinates)
+        elif tag == TEMPORAL:
+            if authority is None:
+                buckets.add("chronological_subject", child)
+        elif tag == NAME:
+            if authority == "naf":
+                column = NAME_SUBJECT_TYPES.get(child.get("type"))
+                if column is not None:
+                    for part in child.iterchildren(NAME_PART):
+                        buckets.add(column, part)
+                    uri = child.get("valueURI")
+                    if uri is not None:
+                        buckets.many[column + "_valueURI"].append(uri)
+
+
+def _genre(buckets, el):
+    authority = el.get("authority")
+    if authority == "aat":
+        column = "aat_genre" if el.get("type") == "genre" else "aat_type"
+        buckets.add(column, el, column + "_valueURI")
+    elif authority == "dct":
+        buckets.add("dcmi_type", el, "dcmi_type_valueURI")
+    elif authority == "imt":
+        buckets.set("imt_type", el)
+    elif authority == "cco":
+        buckets.set("cco_description", el)
+
+
+def _note(buckets, el):
+    column = NOTE_TYPES.get(el.get("type"))
+    if column is not None:
+        buckets.set(column, el)
+
+
+def _location(buckets, el):
+    buckets.set_path("url", el, URL)
+
+
+def _access_condition(buckets, el):
+    buckets.add("rights_management", el)
+
+
+def _origin_info(buckets, el):
+    for child in el:
+        tag = child.tag
+        if tag == DATE_CREATED:
+            buckets.set("date_original", child)
+        elif tag == DATE_CAPTURED:
+            buckets.set("date_digital", child)
+        elif tag == PLACE:
+            buckets.set_path("location_interview", child, PLACE_TERM)
+        elif tag == PUBLISHER:
+            buckets.set("publisher", child)
+            uri = child.get("valueURI")
+            if uri is not None:
+                buckets.first.setdefault("publisher_valueURI", uri)
+        elif tag == ISSUANCE:
+            buckets.set("issuance", child)
+        elif tag == DATE_ISSUED:
+            point = child.get("point")
+            if point == "start":
+                buckets.set("issuance_start", child)
+            elif point == "end":
+                buckets.set("issuance_end", child)
+        elif tag == FREQUENCY:
+            buckets.set("frequency", child)
+
+
+def _record_info(buckets, el):
+    for child in el:
+        if child.tag == RECORD_CREATION_DATE:
+            buckets.set("date_created", child)
+        elif child.tag == RECORD_CHANGE_DATE:
+            buckets.set("date_modified", child)
+
+
+def _physical_description(buckets, el):
+    for child in el:
+        tag = child.tag
+        if tag == EXTENT:
+            buckets.add("extent", child)
+        elif tag == DIGITAL_ORIGIN:
+            buckets.set("digital_origin", child)
+        elif tag == NOTE:
+            column = PHYSICAL_NOTE_TYPES.get(child.get("type"))
+            if column is not None:
+                buckets.set(column, child)
+
+
+HANDLERS = {
+    ABSTRACT: lambda buckets, el: buckets.set("description", el),
+    ACCESS_CONDITION: _access_condition,
+    GENRE: _genre,
+    IDENTIFIER: _identifier,
+    LOCATION: _location,
+    NAME: _name,
+    NOTE: _note,
+    ORIGIN_INFO: _origin_info,
+    PHYSICAL_DESCRIPTION: _physical_description,
+    RECORD_INFO: _record_info,
+    RELATED_ITEM: _related_item,
+    SUBJECT: _subject,
+    TABLE_OF_CONTENTS: lambda buckets, el: buckets.set("table_of_contents", el),
+    TITLE_INFO: _title_info,
+    TYPE_OF_RESOURCE: lambda buckets, el: buckets.set("type_of_resource", el),
+}
@@ -0,0 +1,210 @@
+"""Converting exports and spreadsheets as they're dropped into a folder (isa watch)."""
+import argparse
+import os
+from pathlib import Path
+import queue
+import signal
+import threading
+import time
+
+from isa import archive
+
+# Partial uploads and editor lock files.
+IGNORED_PREFIXES = (".", "~", "__")
+
+
+def main(argv, run):
+    # run(argv) does one conversion, as `isa ARGV` would.
+    parser = argparse.ArgumentParser(prog="isa watch")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--debounce", type=float, default=5.0)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--generate-dc", action="store_true")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args(argv)
+
+    input_dir = Path(args.input).resolve()
+    output_dir = Path(args.output).resolve()
+    if not input_dir.is_dir():
+        parser.error(f"{args.input} is not a directory")
+    if output_dir == input_dir or input_dir in output_dir.parents:
+        parser.error("the output folder can't be inside the watched folder")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    watcher = Watcher(input_dir, args.debounce, args.recursive)
+    work = queue.Queue(args.queue_size)
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=_convert_queued,
+        args=(work, stop, watcher, run, output_dir, args),
+        daemon=True,
+    )
+    worker.start()
+    # Stopped as a service is (SIGTERM) the same way as with Ctrl-C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Watching {input_dir}")
+
+    try:
+        while True:
+            for path, signature in watcher.ready(time.monotonic()):
+                # Queued before it's put, as the worker may finish with it
+                # before put_nowait returns.
+                watcher.queued[path] = signature
+                try:
+                    work.put_nowait((path, signature))
+                except queue.Full:
+                    # Picked up again on a later poll, once there's room.
+                    del watcher.queued[path]
+                    break
+            if args.once and watcher.settled() and not watcher.queued:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("Stopping after the current conversion")
+
+    stop.set()
+    work.put(None)
+    worker.join()
+
+
+def _convert_queued(work, stop, watcher, run, output_dir, args):
+    while (item := work.get()) is not None and not stop.is_set():
+        path, signature = item
+        try:
+            _convert(path, run, output_dir, args)
+        except Exception as e:
+            # Anything else that goes wrong (say the file was removed while
+            # queued) mustn't stop the worker for every later file.
+            print(f"Couldn't convert {path.name}: {type(e).__name__}: {e}")
+        # Marked done even when it failed, so it isn't retried until it
+        # changes again.
+        watcher.converted[path] = signature
+        watcher.queued.pop(path, None)
+
+
+def _convert(path, run, output_dir, args):
+    argv = conversion(path, output_dir, args.generate_dc, args.recursive)
+    if _up_to_date(path, Path(argv[1])):
+        print(f"{argv[1]} is newer than {path.name}; skipping")
+        return
+
+    print(f"Converting {path.name} -> {argv[1]}")
+    start = time.perf_counter()
+    try:
+        run(argv)
+    except (Exception, SystemExit) as e:
+        print(f"Couldn't convert {path.name}: {e}")
+    else:
+        print(f"Converted {path.name} in {time.perf_counter() - start:.2f}s")
+
+
+def conversion(path, output_dir, generate_dc=False, recursive=False):
+    # The isa arguments for a watched file or folder. Spreadsheets are
+    # converted incrementally and exports through the row cache, so only
+    # the rows and records that changed are redone.
+    if path.suffix.lower() == ".csv":
+        argv = [str(path), str(output_dir / path.stem), "--incremental"]
+        if generate_dc:
+            argv.append("--generate-dc")
+        return argv
+
+    if archive.is_archive(path):
+        name = path.name[: -len(_archive_suffix(path.name))]
+        return [str(path), str(output_dir / f"{name}.csv")]
+
+    argv = [str(path), str(output_dir / f"{path.name}.csv"), "--cache"]
+    if recursive:
+        argv.append("--recursive")
+    return argv
+
+
+def _up_to_date(path, output):
+    # Only archives: spreadsheets and export folders have the manifest and
+    # row cache to skip what hasn't changed, but an archive is re-read in
+    # full, which is wasted when the watcher restarts.
+    if not archive.is_archive(path) or not output.exists():
+        return False
+    return output.stat().st_mtime_ns > path.stat().st_mtime_ns
+
+
+def _archive_suffix(name):
+    return next(s for s in archive.ARCHIVE_SUFFIXES if name.lower().endswith(s))
+
+
+class Watcher:
+    # Snapshots of the watched folder's CSVs, export folders and archives,
+    # and which of them have changed and then been left alone for at least
+    # debounce seconds.
+    def __init__(self, input_dir, debounce=5.0, recursive=False):
+        self.input_dir = input_dir
+        self.debounce = debounce
+        self.recursive = recursive
+        self.seen = {}  # path -> [signature, when it last changed]
+        self.converted = {}  # path -> signature it was last converted at
+        self.queued = {}  # path -> signature, waiting or being converted
+
+    def ready(self, now):
+        # (path, signature) for each entry that's new or changed, settled,
+        # and not already queued.
+        snapshot = self.scan()
+        for path in set(self.seen) - set(snapshot):
+            del self.seen[path]
+            self.converted.pop(path, None)
+
+        ready = []
+        for path, signature in snapshot.items():
+            entry = self.seen.get(path)
+            if entry is None or entry[0] != signature:
+                self.seen[path] = entry = [signature, now]
+            if (
+                now - entry[1] >= self.debounce
+                and self.converted.get(path) != signature
+                and path not in self.queued
+            ):
+                ready.append((path, signature))
+        return ready
+
+    def settled(self):
+        return all(self.converted.get(path) == s for path, (s, _) in self.seen.items())
+
+    def scan(self):
+        snapshot = {}
+        with os.scandir(self.input_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(IGNORED_PREFIXES):
+                    continue
+                path = Path(entry.path)
+                if entry.is_dir():
+                    signature = _folder_signature(entry.path, self.recursive)
+                elif entry.name.lower().endswith(".csv") or archive.is_archive(path):
+                    stat = entry.stat()
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                else:
+                    continue
+                if signature is not None:
+                    snapshot[path] = signature
+        return snapshot
+
+
+def _folder_signature(folder, recursive=False):
+    # Changes whenever an XML file in folder is added, removed or written
+    # to. None for a folder with no XML files (yet).
+    count = size = latest = 0
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith(IGNORED_PREFIXES):
+                    continue
+                if entry.is_dir():
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.name.endswith(".xml"):
+                    stat = entry.stat()
+                    count += 1
+                    size += stat.st_size
+                    latest = max(latest, stat.st_mtime_ns)
+    return (count, size, latest) if count else None
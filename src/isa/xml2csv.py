@@ -1,718 +1,904 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import csv
-from pathlib import Path
+from io import BytesIO
+from itertools import chain, islice
+import os
+from operator import attrgetter
+from pathlib import Path, PurePosixPath
 import re
+import time
 
-from lxml.etree import parse, XMLSyntaxError
+from lxml.etree import parse, XMLSyntaxError, XPath
 
+from isa import archive, cache, treewalk
+from isa.columns import HEADERS
 
-def load_xml(xml_dir, alpha=False):
-    xmls = []
-    for x in sort_xml_paths(Path(xml_dir).glob("*.xml"), alpha):
+# Positions of the columns compound reordering looks at.
+LOCAL_ID = HEADERS.index("local_id")
+FILE_NAME = HEADERS.index("file_name")
+
+# Rows held back for compound reordering when streaming; see iter_reordered.
+REORDER_WINDOW = 10000
+
+# Columns compound reordering reads; extracted even when not written.
+REORDER_COLUMNS = ("title", "local_id", "file_name")
+
+
+def load_xml(xml_dir, alpha=False, recursive=False):
+    return list(iter_xml(xml_dir, alpha, recursive))
+
+
+def xml_paths(xml_dir, alpha=False, recursive=False):
+    # recursive also reads subdirectories, such as a sharded csv2xml output
+    # folder, in the same order as if every file were in xml_dir.
+    xml_dir = Path(xml_dir)
+    xmls = xml_dir.rglob("*.xml") if recursive else xml_dir.glob("*.xml")
+    return sort_xml_paths(xmls, alpha)
+
+
+def xml_sources(xml_dir, alpha=False, recursive=False):
+    # The XML files of a directory as paths, or of a zip/tar archive as
+    # (member name, bytes) pairs, both in sort_xml_paths order.
+    xml_dir = Path(xml_dir)
+    if not archive.is_archive(xml_dir):
+        return xml_paths(xml_dir, alpha, recursive)
+
+    names = {PurePosixPath(name): name for name in archive.member_names(xml_dir)}
+    order = [names[x] for x in sort_xml_paths(names, alpha)]
+    return archive.iter_members(xml_dir, order)
+
+
+def iter_xml(xml_dir, alpha=False, recursive=False):
+    return iter_parsed(xml_sources(xml_dir, alpha, recursive))
+
+
+def iter_parsed(sources):
+    for x in sources:
         try:
-            xmls.append(parse(str(x)))
+            yield parse_source(x)
         except XMLSyntaxError:
-            print(f"Couldn't parse {x}! Skipping! Sorry!")
+            print(f"Couldn't parse {source_name(x)}! Skipping! Sorry!")
+
 
-    return xmls
+def parse_source(x):
+    # x is a path, or a (name, bytes) archive member; see xml_sources.
+    if isinstance(x, tuple):
+        return parse(BytesIO(x[1]))
+    return parse(str(x))
+
+
+def source_name(x):
+    return x[0] if isinstance(x, tuple) else x
 
 
 def sort_xml_paths(xmls, alpha=False):
     if alpha:
-        return sorted(xmls)
+        # By file name first, so files in different subdirectories sort as
+        # they would side by side.
+        return sorted(xmls, key=lambda x: (x.name, x))
+
+    # Ties (every stem without a trailing number is 0) go by file name before
+    # the path, so shard folders don't change the order.
+    to_sort = []
+    for x in xmls:
+        number = x.stem.split("_")[-1]
+        to_sort.append((int(number) if number.isdigit() else 0, x.name, x))
+    return [x[-1] for x in sorted(to_sort)]
+
+
+def xml_to_csv(mds, engine="xpath", columns=None):
+    xpaths = column_xpaths(columns)
+    return [XmlMD(md, engine, xpaths=xpaths) for md in mds]
+
+
+def iter_rows(mds, engine="xpath", field_stats=None, columns=None):
+    xpaths = column_xpaths(columns)
+    for md in mds:
+        yield XmlMD(md, engine, field_stats, xpaths).to_row()
+
+
+def column_xpaths(columns):
+    # The compiled XPaths for just these columns, or None for all of them.
+    if columns is None:
+        return None
+
+    wanted = set(columns)
+    return [entry for entry in XPATHS if entry[0] in wanted]
+
+
+def iter_rows_parallel(
+    paths, engine="xpath", workers=None, chunk_size=64, columns=None
+):
+    # Rows come back in the order of paths (or archive members; see
+    # xml_sources).
+    chunks = map_chunks(_extract_rows, paths, (engine, columns), workers, chunk_size)
+    for chunk, rows in chunks:
+        yield from _finish_chunk(chunk, rows)
+
+
+def iter_rows_journaled(
+    paths, journal, engine="xpath", workers=1, chunk_size=64, columns=None
+):
+    # Like iter_rows_parallel, but each source's row goes into journal as it
+    # comes back, and sources the journal already has a row for are
+    # replayed from it instead of extracted again (--resume). Replay stops
+    # at the first source that was renamed, edited or removed since.
+    paths = iter(paths)
+    for offset, (name, stamp, row) in journal.replay():
+        x = next(paths, None)
+        if x is None or name != str(source_name(x)) or stamp != _stamp(x):
+            journal.truncate(offset)
+            if x is not None:
+                paths = chain([x], paths)
+            break
+        if row is not None:
+            yield row
+
+    chunks = map_chunks(_extract_rows, paths, (engine, columns), workers, chunk_size)
+    for chunk, rows in chunks:
+        for x, row in zip(chunk, rows):
+            journal.record(str(source_name(x)), _stamp(x), row)
+        journal.checkpoint()
+        yield from _finish_chunk(chunk, rows)
+
+
+def _stamp(x):
+    # Enough to tell whether a source changed since it was journaled.
+    if isinstance(x, tuple):
+        return cache.digest(x[1])
+    stat = os.stat(x)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def map_chunks(func, items, args=(), workers=None, chunk_size=64):
+    # (chunk, func(chunk, *args)) for each run of chunk_size items, in order,
+    # with func called in worker processes. Only a couple of chunks per
+    # worker are in flight at once so memory stays bounded; with one worker
+    # everything happens in this process.
+    items = iter(items)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        while chunk := list(islice(items, chunk_size)):
+            yield chunk, func(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        while chunk := list(islice(items, chunk_size)):
+            pending.append((chunk, executor.submit(func, chunk, *args)))
+            if len(pending) > 2 * workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+def _extract_rows(paths, engine, columns=None):
+    xpaths = column_xpaths(columns)
+    rows = []
+    for x in paths:
+        try:
+            rows.append(XmlMD(parse_source(x), engine, xpaths=xpaths).to_row())
+        except XMLSyntaxError:
+            rows.append(None)
+
+    return rows
+
+
+def _finish_chunk(paths, rows):
+    for x, row in zip(paths, rows):
+        if row is None:
+            print(f"Couldn't parse {source_name(x)}! Skipping! Sorry!")
+        else:
+            yield row
+
+
+def iter_rows_cached(paths, row_cache, engine="xpath", workers=1, chunk_size=64):
+    # Files whose size and mtime match their cache entry aren't opened. The
+    # rest are read and hashed, and only parsed when the hash changed too.
+    # Misses are extracted chunk by chunk, in worker processes unless
+    # workers is 1, and rows still come back in the order of paths.
+    chunks = _cache_chunks(paths, row_cache, chunk_size)
+    if workers == 1:
+        for chunk, misses in chunks:
+            results = _extract_changed(misses, engine)
+            yield from _finish_cached_chunk(chunk, results, row_cache)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            pending = deque()
+            for chunk, misses in chunks:
+                future = misses and executor.submit(_extract_changed, misses, engine)
+                pending.append((chunk, future))
+                if len(pending) > 2 * workers:
+                    yield from _finish_cached_future(*pending.popleft(), row_cache)
+
+            while pending:
+                yield from _finish_cached_future(*pending.popleft(), row_cache)
+
+    row_cache.prune()
+
+
+def _cache_chunks(paths, row_cache, chunk_size):
+    chunk = []
+    misses = []
+    for x in paths:
+        stat = x.stat()
+        entry = row_cache.lookup(str(x))
+        if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+            misses.append((str(x), entry and entry[2]))
+        chunk.append((x, stat, entry))
+        if len(chunk) == chunk_size:
+            yield chunk, misses
+            chunk = []
+            misses = []
+
+    if chunk:
+        yield chunk, misses
+
+
+def _extract_changed(misses, engine):
+    # (digest, row) per miss. row is None when the file still has the cached
+    # digest, or when it doesn't parse.
+    results = []
+    for x, cached_digest in misses:
+        with open(x, "rb") as fh:
+            data = fh.read()
+        digest = cache.digest(data)
+        if digest == cached_digest:
+            results.append((digest, None))
+            continue
+
+        try:
+            row = XmlMD(parse(BytesIO(data)), engine).to_row()
+        except XMLSyntaxError:
+            row = None
+        results.append((digest, row))
+
+    return results
+
+
+def _finish_cached_future(chunk, future, row_cache):
+    results = future.result() if future else []
+    return _finish_cached_chunk(chunk, results, row_cache)
+
+
+def _finish_cached_chunk(chunk, results, row_cache):
+    results = iter(results)
+    for x, stat, entry in chunk:
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+            row_cache.hits += 1
+            yield row_cache.row(entry)
+            continue
+
+        digest, row = next(results)
+        if entry is not None and digest == entry[2]:
+            row_cache.rehashed += 1
+            row = row_cache.row(entry)
+        elif row is None:
+            print(f"Couldn't parse {x}! Skipping! Sorry!")
+            continue
+        else:
+            row_cache.parsed += 1
+
+        row_cache.store(str(x), stat, digest, row)
+        yield row
+
+
+def save_csv(mds, output_path, reorder=True, new=False, columns=None):
+    rows = [md.to_row() for md in mds]
+    rows = reorder_compound_objects(rows, new) if reorder else rows
+
+    csv_md = [columns or HEADERS] + list(project(rows, columns))
+
+    with open(output_path, "w", encoding="utf8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerows(csv_md)
+
+
+def write_csv(
+    rows,
+    output_path,
+    reorder=True,
+    new=False,
+    window=REORDER_WINDOW,
+    stats=None,
+    columns=None,
+):
+    if reorder:
+        rows = iter_reordered(rows, new, window, stats)
+
+    with open(output_path, "w", encoding="utf8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(columns or HEADERS)
+        writer.writerows(project(rows, columns))
+
 
-    to_sort = [
-        (int(x.stem.split("_")[-1]), x) if x.stem.split("_")[-1].isdigit() else (0, x)
-        for x in xmls
-    ]
-    return [x[1] for x in sorted(to_sort)]
+def project(rows, columns):
+    # Full-width rows cut down to columns, in that order.
+    if columns is None:
+        return rows
 
+    indices = [HEADERS.index(name) for name in columns]
+    return ([row[i] for i in indices] for row in rows)
 
-def xml_to_csv(mds):
-    return [XmlMD(md) for md in mds]
 
+PAGE_PATTERN = re.compile(
+    r"^(([Bb]ack|[Bb]iographical|[Ff]ront|[Hh]istorical)? ?([Bb]lank|[Cc]ontents|[Cc]over|[Dd]edication|[Dd]iagrams?|[Dd]rawings?|[Ii]llustrations?|[Ii]ndex|[Ii]ntroduction|[Mm]aps?|[Nn]otes?|[Pp]hotographs?|[Pp]ortraits?|[Pp]reface|[Tt]itle)?,? ?([Pp]age|[Pp]g?\.?)? ?(\d*[A-Za-z]?|[ivxIVX]*|Verso)?|-)$"
+)
 
-def save_csv(mds, output_path, reorder=True, new=False):
-    headers = [
-        "pid",
-        "title",
+
+class ReorderStats:
+    def __init__(self):
+        self.parents = 0
+        self.pages = 0
+        self.seconds = 0.0
+
+
+def is_page(md):
+    return PAGE_PATTERN.match(md[1])
+
+
+def reorder_compound_objects(rows, new=False, stats=None):
+    return list(iter_reordered(rows, new, None, stats))
+
+
+def _compound_keys(row):
+    return {row[LOCAL_ID].strip(), row[FILE_NAME].split(".")[0].strip()}
+
+
+def iter_reordered(rows, new=False, window=REORDER_WINDOW, stats=None):
+    reorder = _group_pages if new else _move_parents
+    if stats is None:
+        return reorder(rows, window, ReorderStats())
+
+    # Only count the time spent reordering, not producing the incoming rows.
+    return _timed(reorder(_timed(rows, stats, -1), window, stats), stats, 1)
+
+
+def _timed(rows, stats, sign):
+    rows = iter(rows)
+    while True:
+        start = time.perf_counter()
+        row = next(rows, None)
+        stats.seconds += sign * (time.perf_counter() - start)
+        if row is None:
+            return
+        yield row
+
+
+def _group_pages(rows, window, stats):
+    # Pages come before their parent in the export; emit each parent (any row
+    # whose title doesn't look like a page) followed by the run of pages
+    # collected since the previous parent. Runs longer than window are
+    # flushed as they grow.
+    pages = deque()
+    for row in rows:
+        if is_page(row):
+            stats.pages += 1
+            pages.append(row)
+            if window and len(pages) > window:
+                yield pages.popleft()
+        else:
+            stats.parents += 1
+            yield row
+            yield from pages
+            pages.clear()
+
+    yield from pages
+
+
+def _move_parents(rows, window, stats):
+    # Each compound parent (a row without a file name) is moved in front of
+    # the first row since the previous parent's slot whose local_id or
+    # file-name stem matches the parent's local_id. Those rows are buffered,
+    # capped at window rows (None for no cap), and positions maps every key
+    # in the buffer to the absolute row numbers carrying it, so finding the
+    # match is a dict lookup and each row is yielded exactly once.
+    buffer = deque()
+    base = 0
+    positions = {}
+    for row in rows:
+        # If there's no file name
+        if not (row[FILE_NAME]):
+            stats.parents += 1
+            matches = positions.get(row[LOCAL_ID].strip())
+            if matches:
+                for _ in range(matches[0] - base):
+                    yield buffer.popleft()
+                yield row
+                row = buffer.pop()
+            yield from buffer
+
+            # The row left in the parent's slot starts the next window.
+            buffer = deque([row])
+            base = 0
+            positions = {key: deque([0]) for key in _compound_keys(row)}
+        else:
+            stats.pages += 1
+            for key in _compound_keys(row):
+                positions.setdefault(key, deque()).append(base + len(buffer))
+            buffer.append(row)
+
+            if window and len(buffer) > window:
+                evicted = buffer.popleft()
+                for key in _compound_keys(evicted):
+                    positions[key].popleft()
+                    if not positions[key]:
+                        del positions[key]
+                base += 1
+                yield evicted
+
+    yield from buffer
+
+
+NS = {"mods": "http://www.loc.gov/mods/v3"}
+
+# (attribute, XPath expression, whether the results are joined with "; ")
+FIELDS = [
+    ("pid", "string(/mods:mods/mods:identifier[@type='islandora'])", False),
+    ("title", "string(/mods:mods/mods:titleInfo/mods:title)", False),
+    (
         "archival_call_number",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:identifier[@displayLabel='Call Number'])",
+        False,
+    ),
+    (
         "archival_collection",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "finding_aid_ark",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:identifier[@type='ark'])",
+        False,
+    ),
+    (
         "physical_location",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:location/mods:physicalLocation)",
+        False,
+    ),
+    (
         "archival_series_title",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='series']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "folder_title",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='series']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "box",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "folder",
+        "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='constituent']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "contributing_institution",
+        "string(/mods:mods/mods:name/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='curator'])",
+        False,
+    ),
+    (
         "contributing_institution_valueURI",
+        "string(/mods:mods/mods:name[mods:role/mods:roleTerm/text()='curator']/@valueURI)",
+        False,
+    ),
+    (
         "personal_creator",
+        "/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='creator']/text()",
+        True,
+    ),
+    (
         "personal_creator_valueURI",
+        "/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='creator']/@valueURI",
+        True,
+    ),
+    (
         "corporate_creator",
+        "/mods:mods/mods:name[@type='corporate']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='creator']/text()",
+        True,
+    ),
+    (
         "corporate_creator_valueURI",
+        "/mods:mods/mods:name[@type='corporate' and ./mods:role/mods:roleTerm/text()='creator']/@valueURI",
+        True,
+    ),
+    (
         "interviewee",
+        "string(/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='interviewee']/text())",
+        False,
+    ),
+    (
         "interviewee_valueURI",
+        "string(/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='interviewee']/@valueURI)",
+        False,
+    ),
+    (
         "interviewer",
+        "string(/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='interviewer']/text())",
+        False,
+    ),
+    (
         "interviewer_valueURI",
+        "string(/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='interviewer']/@valueURI)",
+        False,
+    ),
+    (
         "personal_contributor",
+        "/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='contributor']/text()",
+        True,
+    ),
+    (
         "personal_contributor_valueURI",
+        "/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='contributor']/@valueURI",
+        True,
+    ),
+    (
         "corporate_contributor",
+        "/mods:mods/mods:name[@type='corporate']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='contributor']/text()",
+        True,
+    ),
+    (
         "corporate_contributor_valueURI",
-        "description",
-        "table_of_contents",
-        "annotation",
-        "url",
-        "language",
+        "/mods:mods/mods:name[@type='corporate' and ./mods:role/mods:roleTerm/text()='contributor']/@valueURI",
+        True,
+    ),
+    ("description", "string(/mods:mods/mods:abstract)", False),
+    ("table_of_contents", "string(/mods:mods/mods:tableOfContents)", False),
+    ("annotation", "string(/mods:mods/mods:note[@type='annotation'])", False),
+    ("url", "string(/mods:mods/mods:location/mods:url)", False),
+    ("language", "mods:language/mods:languageTerm/text()", True),
+    (
         "topical_subject_fast",
+        "/mods:mods/mods:subject[@authority='fast']/mods:topic/text()",
+        True,
+    ),
+    (
         "topical_subject_fast_valueURI",
+        "/mods:mods/mods:subject[@authority='fast']/mods:topic/@valueURI",
+        True,
+    ),
+    (
         "geographic_subject_fast",
+        "/mods:mods/mods:subject[@authority='fast']/mods:geographic/text()",
+        True,
+    ),
+    (
         "geographic_subject_fast_valueURI",
+        "/mods:mods/mods:subject[@authority='fast']/mods:geographic/@valueURI",
+        True,
+    ),
+    (
         "topical_subject_lcsh",
+        "/mods:mods/mods:subject[@authority='lcsh']/mods:topic/text()",
+        True,
+    ),
+    (
         "topical_subject_lcsh_valueURI",
+        "/mods:mods/mods:subject[@authority='lcsh']/mods:topic/@valueURI",
+        True,
+    ),
+    (
         "topical_subject_local",
+        "/mods:mods/mods:subject[@authority='local']/mods:topic/text()",
+        True,
+    ),
+    (
         "topical_subject_local_valueURI",
+        "/mods:mods/mods:subject[@authority='local']/mods:topic/@valueURI",
+        True,
+    ),
+    (
         "geographic_subject_lcsh",
+        "/mods:mods/mods:subject[@authority='lcsh']/mods:geographic/text()",
+        True,
+    ),
+    (
         "geographic_subject_lcsh_valueURI",
+        "/mods:mods/mods:subject[@authority='lcsh']/mods:geographic/@valueURI",
+        True,
+    ),
+    (
         "geographic_subject_local",
+        "/mods:mods/mods:subject[@authority='local']/mods:geographic/text()",
+        True,
+    ),
+    (
         "geographic_subject_local_valueURI",
+        "/mods:mods/mods:subject[@authority='local']/mods:geographic/@valueURI",
+        True,
+    ),
+    (
         "geographic_subject_geonames",
+        "/mods:mods/mods:subject[@authority='geonames']/mods:geographic/text()",
+        True,
+    ),
+    (
         "geographic_subject_geonames_valueURI",
+        "/mods:mods/mods:subject[@authority='geonames']/mods:geographic/@valueURI",
+        True,
+    ),
+    (
         "coordinates",
+        "/mods:mods/mods:subject/mods:geographic/mods:coordinates/text()",
+        True,
+    ),
+    (
         "personal_name_subject",
+        "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='personal']/mods:namePart/text()",
+        True,
+    ),
+    (
         "personal_name_subject_valueURI",
+        "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='personal']/@valueURI",
+        True,
+    ),
+    (
         "corporate_name_subject",
+        "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='corporate']/mods:namePart/text()",
+        True,
+    ),
+    (
         "corporate_name_subject_valueURI",
+        "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='corporate']/@valueURI",
+        True,
+    ),
+    (
         "birds_subject",
+        "/mods:mods/mods:subject[@authority='gbif']/mods:topic/text()",
+        True,
+    ),
+    (
         "birds_subject_valueURI",
+        "/mods:mods/mods:subject[@authority='gbif']/mods:topic/@valueURI",
+        True,
+    ),
+    (
         "chronological_subject",
+        "/mods:mods/mods:subject[not(@authority)]/mods:temporal/text()",
+        True,
+    ),
+    (
         "event_subject",
+        "/mods:mods/mods:subject[not(@authority)]/mods:topic/text()",
+        True,
+    ),
+    (
         "event_subject_valueURI",
-        "extent",
+        "/mods:mods/mods:subject[not(@authority)]/mods:topic/@valueURI",
+        True,
+    ),
+    ("extent", "/mods:mods/mods:physicalDescription/mods:extent/text()", True),
+    (
         "aat_type",
+        "/mods:mods/mods:genre[@authority='aat' and not(@type='genre')]/text()",
+        True,
+    ),
+    (
         "aat_type_valueURI",
+        "/mods:mods/mods:genre[@authority='aat' and not(@type='genre')]/@valueURI",
+        True,
+    ),
+    (
         "aat_genre",
+        "/mods:mods/mods:genre[@authority='aat' and @type='genre']/text()",
+        True,
+    ),
+    ("dcmi_type", "/mods:mods/mods:genre[@authority='dct']/text()", True),
+    (
         "aat_genre_valueURI",
-        "dcmi_type",
-        "dcmi_type_valueURI",
-        "type_of_resource",
-        "imt_type",
-        "cco_description",
-        "rights_management",
-        "rights_management_valueURI",
-        "date_original",
-        "date_digital",
+        "/mods:mods/mods:genre[@authority='aat' and @type='genre']/@valueURI",
+        True,
+    ),
+    ("dcmi_type_valueURI", "/mods:mods/mods:genre[@authority='dct']/@valueURI", True),
+    ("type_of_resource", "string(/mods:mods/mods:typeOfResource)", False),
+    ("imt_type", "string(/mods:mods/mods:genre[@authority='imt'])", False),
+    ("cco_description", "string(/mods:mods/mods:genre[@authority='cco'])", False),
+    ("rights_management", "/mods:mods/mods:accessCondition/text()", True),
+    ("rights_management_valueURI", "mods:mods/mods:accessCondition/@valueURI", True),
+    ("date_original", "string(/mods:mods/mods:originInfo/mods:dateCreated)", False),
+    ("date_digital", "string(/mods:mods/mods:originInfo/mods:dateCaptured)", False),
+    (
         "location_interview",
-        "publisher",
+        "string(/mods:mods/mods:originInfo/mods:place/mods:placeTerm)",
+        False,
+    ),
+    ("publisher", "string(/mods:mods/mods:originInfo/mods:publisher)", False),
+    (
         "publisher_valueURI",
-        "ark",
-        "local_id",
-        "file_name",
-        "uid",
-        "avian_id",
+        "string(/mods:mods/mods:originInfo/mods:publisher/@valueURI)",
+        False,
+    ),
+    ("ark", "string(/mods:mods/mods:identifier[@type='ark'])", False),
+    ("local_id", "string(/mods:mods/mods:identifier[@type='local'])", False),
+    ("file_name", "string(/mods:mods/mods:identifier[not(@*)])", False),
+    ("uid", "string(/mods:mods/mods:identifier[@type='uid'])", False),
+    ("avian_id", "string(/mods:mods/mods:identifier[@type='avian-id'])", False),
+    (
         "project_number",
+        "string(/mods:mods/mods:identifier[@type='project-number'])",
+        False,
+    ),
+    (
         "date_created",
+        "string(/mods:mods/mods:recordInfo/mods:recordCreationDate)",
+        False,
+    ),
+    (
         "date_modified",
-        "issuance",
+        "string(/mods:mods/mods:recordInfo/mods:recordChangeDate)",
+        False,
+    ),
+    ("issuance", "string(/mods:mods/mods:originInfo/mods:issuance)", False),
+    (
         "issuance_start",
+        "string(/mods:mods/mods:originInfo/mods:dateIssued[@point='start'])",
+        False,
+    ),
+    (
         "issuance_end",
-        "frequency",
+        "string(/mods:mods/mods:originInfo/mods:dateIssued[@point='end'])",
+        False,
+    ),
+    ("frequency", "string(/mods:mods/mods:originInfo/mods:frequency)", False),
+    (
         "digital_collection",
+        "string(/mods:mods/mods:relatedItem[@type='host']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "digital_collection_ark",
+        "string(/mods:mods/mods:relatedItem[@type='host']/mods:identifier[@type='ark'])",
+        False,
+    ),
+    (
         "related_exhibit",
+        "string(/mods:mods/mods:relatedItem[@type = 'isReferencedBy']/mods:titleInfo/mods:title)",
+        False,
+    ),
+    (
         "related_exhibit_url",
+        "string(/mods:mods/mods:relatedItem[@type = 'isReferencedBy']/mods:identifier)",
+        False,
+    ),
+    (
         "hardware_software",
-        "disclaimer",
+        "string(/mods:mods/mods:note[@type='hardware/software'])",
+        False,
+    ),
+    ("disclaimer", "string(/mods:mods/mods:note[@type='Disclaimer'])", False),
+    (
         "image_manipulation",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='image-manipulation'])",
+        False,
+    ),
+    (
         "file_size",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='file-size'])",
+        False,
+    ),
+    (
         "resolution",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='resolution'])",
+        False,
+    ),
+    (
         "colorspace",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='colorspace'])",
+        False,
+    ),
+    (
         "bits_per_sample",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='bits-per-sample'])",
+        False,
+    ),
+    (
         "samples_per_pixel",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='samples-per-pixel'])",
+        False,
+    ),
+    (
         "height",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='height'])",
+        False,
+    ),
+    (
         "width",
+        "string(/mods:mods/mods:physicalDescription/mods:note[@type='width'])",
+        False,
+    ),
+    (
         "digital_origin",
-    ]
+        "string(/mods:mods/mods:physicalDescription/mods:digitalOrigin)",
+        False,
+    ),
+]
 
-    rows = [md.to_row() for md in mds]
+XPATHS = [
+    (name, XPath(expression, namespaces=NS, smart_strings=False), joined)
+    for name, expression, joined in FIELDS
+]
 
-    csv_md = [headers] + (reorder_compound_objects(rows, new) if reorder else rows)
 
-    with open(output_path, "w", encoding="utf8", newline="") as fh:
-        writer = csv.writer(fh)
-        writer.writerows(csv_md)
+ENGINES = ("xpath", "walk")
 
+ROW = attrgetter(*HEADERS)
 
-def is_page(md):
-    page_pattern = re.compile(
-        r"^(([Bb]ack|[Bb]iographical|[Ff]ront|[Hh]istorical)? ?([Bb]lank|[Cc]ontents|[Cc]over|[Dd]edication|[Dd]iagrams?|[Dd]rawings?|[Ii]llustrations?|[Ii]ndex|[Ii]ntroduction|[Mm]aps?|[Nn]otes?|[Pp]hotographs?|[Pp]ortraits?|[Pp]reface|[Tt]itle)?,? ?([Pp]age|[Pp]g?\.?)? ?(\d*[A-Za-z]?|[ivxIVX]*|Verso)?|-)$"
-    )
-    return page_pattern.match(md[1])
-
-def reorder_compound_objects(rows, new=False):
-    if new:
-        fixed = []
-        last_non_page_index = 0
-
-        for idx, row in enumerate(rows):
-            if is_page(row):
-                fixed.append(row)
-            else:
-                fixed.insert(
-                    last_non_page_index + 1 if last_non_page_index > 0 else 0, row
-                )
-                last_non_page_index = idx
-
-        return fixed
-
-    last_compound = 0
-    for i, row in enumerate(rows):
-        # If there's no file name
-        if not (row[70]):
-            local_id = row[69].strip()
-            parent_row = row
-            for r in rows[last_compound:i]:
-                if local_id in (r[69].strip(), r[70].split(".")[0].strip()):
-                    rows = (
-                        rows[: rows.index(r)]
-                        + [parent_row]
-                        + rows[rows.index(r) : i]
-                        + rows[i + 1 :]
-                    )
-                    break
-
-            last_compound = i
 
-    return rows
+class FieldStats:
+    # Cumulative XPath time and non-empty results per column, collected by
+    # XmlMD when it's given one. Always uses the xpath engine.
+    def __init__(self):
+        self.records = 0
+        # Only the columns that were extracted get entries.
+        self.seconds = {}
+        self.hits = {}
+
+    def extract(self, xml_md, md, xpaths=XPATHS):
+        self.records += 1
+        for name, xpath, joined in xpaths:
+            start = time.perf_counter()
+            value = xpath(md)
+            seconds = time.perf_counter() - start
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.hits[name] = self.hits.get(name, 0) + bool(value)
+            setattr(xml_md, name, "; ".join(value) if joined else value)
+
+    def empty(self):
+        return [name for name in self.hits if not self.hits[name]]
+
+    def report(self):
+        total = sum(self.seconds.values()) or 1
+        records = self.records or 1
+        lines = [
+            f"{'column':<40} {'total s':>9} {'us/rec':>9} {'share':>7} {'hits':>7}"
+        ]
+        for name in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            seconds = self.seconds[name]
+            lines.append(
+                f"{name:<40} {seconds:9.3f} {1e6 * seconds / records:9.1f} "
+                f"{seconds / total:7.1%} {self.hits[name] / records:7.1%}"
+            )
+        lines.append(f"{self.records} records, {sum(self.seconds.values()):.3f}s")
+        return "\n".join(lines)
 
 
 class XmlMD:
-    def __init__(self, md):
-        ns = {"mods": "http://www.loc.gov/mods/v3"}
-
-        self.pid = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='islandora'])", namespaces=ns
-        )
-        self.title = md.xpath(
-            "string(/mods:mods/mods:titleInfo/mods:title)", namespaces=ns
-        )
-        self.archival_call_number = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:identifier[@displayLabel='Call Number'])",
-            namespaces=ns,
-        )
-        self.archival_collection = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.finding_aid_ark = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:identifier[@type='ark'])",
-            namespaces=ns,
-        )
-        self.physical_location = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:location/mods:physicalLocation)",
-            namespaces=ns,
-        )
-        self.archival_series_title = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='series']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.folder_title = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='series']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.box = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.folder = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='original']/mods:relatedItem[@type='constituent']/mods:relatedItem[@type='constituent']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.contributing_institution = md.xpath(
-            "string(/mods:mods/mods:name/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='curator'])",
-            namespaces=ns,
-        )
-        self.contributing_institution_valueURI = md.xpath(
-            "string(/mods:mods/mods:name[mods:role/mods:roleTerm/text()='curator']/@valueURI)",
-            namespaces=ns,
-        )
-        self.personal_creator = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='creator']/text()",
-                namespaces=ns,
-            )
-        )
-        self.personal_creator_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='creator']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.corporate_creator = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='corporate']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='creator']/text()",
-                namespaces=ns,
-            )
-        )
-        self.corporate_creator_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='corporate' and ./mods:role/mods:roleTerm/text()='creator']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.interviewee = md.xpath(
-            "string(/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='interviewee']/text())",
-            namespaces=ns,
-        )
-        self.interviewee_valueURI = md.xpath(
-            "string(/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='interviewee']/@valueURI)",
-            namespaces=ns,
-        )
-        self.interviewer = md.xpath(
-            "string(/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='interviewer']/text())",
-            namespaces=ns,
-        )
-        self.interviewer_valueURI = md.xpath(
-            "string(/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='interviewer']/@valueURI)",
-            namespaces=ns,
-        )
-        self.personal_contributor = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='personal']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='contributor']/text()",
-                namespaces=ns,
-            )
-        )
-        self.personal_contributor_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='personal' and ./mods:role/mods:roleTerm/text()='contributor']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.corporate_contributor = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='corporate']/mods:namePart[following-sibling::mods:role/mods:roleTerm/text()='contributor']/text()",
-                namespaces=ns,
-            )
-        )
-        self.corporate_contributor_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:name[@type='corporate' and ./mods:role/mods:roleTerm/text()='contributor']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.description = md.xpath("string(/mods:mods/mods:abstract)", namespaces=ns)
-        self.table_of_contents = md.xpath(
-            "string(/mods:mods/mods:tableOfContents)", namespaces=ns
-        )
-        self.annotation = md.xpath(
-            "string(/mods:mods/mods:note[@type='annotation'])", namespaces=ns
-        )
-        self.url = md.xpath("string(/mods:mods/mods:location/mods:url)", namespaces=ns)
-        self.language = "; ".join(
-            md.xpath("mods:language/mods:languageTerm/text()", namespaces=ns)
-        )
-        self.topical_subject_fast = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='fast']/mods:topic/text()",
-                namespaces=ns,
-            )
-        )
-        self.topical_subject_fast_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='fast']/mods:topic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_fast = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='fast']/mods:geographic/text()",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_fast_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='fast']/mods:geographic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.topical_subject_lcsh = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='lcsh']/mods:topic/text()",
-                namespaces=ns,
-            )
-        )
-        self.topical_subject_lcsh_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='lcsh']/mods:topic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.topical_subject_local = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='local']/mods:topic/text()",
-                namespaces=ns,
-            )
-        )
-        self.topical_subject_local_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='local']/mods:topic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_lcsh = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='lcsh']/mods:geographic/text()",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_lcsh_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='lcsh']/mods:geographic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_local = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='local']/mods:geographic/text()",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_local_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='local']/mods:geographic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_geonames = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='geonames']/mods:geographic/text()",
-                namespaces=ns,
-            )
-        )
-        self.geographic_subject_geonames_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='geonames']/mods:geographic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.coordinates = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject/mods:geographic/mods:coordinates/text()",
-                namespaces=ns,
-            )
-        )
-        self.personal_name_subject = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='personal']/mods:namePart/text()",
-                namespaces=ns,
-            )
-        )
-        self.personal_name_subject_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='personal']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.corporate_name_subject = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='corporate']/mods:namePart/text()",
-                namespaces=ns,
-            )
-        )
-        self.corporate_name_subject_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='naf']/mods:name[@type='corporate']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.birds_subject = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='gbif']/mods:topic/text()",
-                namespaces=ns,
-            )
-        )
-        self.birds_subject_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[@authority='gbif']/mods:topic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.chronological_subject = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[not(@authority)]/mods:temporal/text()",
-                namespaces=ns,
-            )
-        )
-        self.event_subject = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[not(@authority)]/mods:topic/text()",
-                namespaces=ns,
-            )
-        )
-        self.event_subject_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:subject[not(@authority)]/mods:topic/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.extent = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:physicalDescription/mods:extent/text()", namespaces=ns
-            )
-        )
-        self.aat_type = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:genre[@authority='aat' and not(@type='genre')]/text()",
-                namespaces=ns,
-            )
-        )
-        self.aat_type_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:genre[@authority='aat' and not(@type='genre')]/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.aat_genre = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:genre[@authority='aat' and @type='genre']/text()",
-                namespaces=ns,
-            )
-        )
-        self.dcmi_type = "; ".join(
-            md.xpath("/mods:mods/mods:genre[@authority='dct']/text()", namespaces=ns)
-        )
-        self.aat_genre_valueURI = "; ".join(
-            md.xpath(
-                "/mods:mods/mods:genre[@authority='aat' and @type='genre']/@valueURI",
-                namespaces=ns,
-            )
-        )
-        self.dcmi_type_valueURI = "; ".join(
-            md.xpath("/mods:mods/mods:genre[@authority='dct']/@valueURI", namespaces=ns)
-        )
-        self.type_of_resource = md.xpath(
-            "string(/mods:mods/mods:typeOfResource)", namespaces=ns
-        )
-        self.imt_type = md.xpath(
-            "string(/mods:mods/mods:genre[@authority='imt'])", namespaces=ns
-        )
-        self.cco_description = md.xpath(
-            "string(/mods:mods/mods:genre[@authority='cco'])", namespaces=ns
-        )
-        self.rights_management = "; ".join(
-            md.xpath("/mods:mods/mods:accessCondition/text()", namespaces=ns)
-        )
-        self.rights_management_valueURI = "; ".join(
-            md.xpath("mods:mods/mods:accessCondition/@valueURI", namespaces=ns)
-        )
-        self.date_original = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:dateCreated)", namespaces=ns
-        )
-        self.date_digital = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:dateCaptured)", namespaces=ns
-        )
-        self.location_interview = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:place/mods:placeTerm)",
-            namespaces=ns,
-        )
-        self.publisher = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:publisher)", namespaces=ns
-        )
-        self.publisher_valueURI = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:publisher/@valueURI)", namespaces=ns
-        )
-        self.ark = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='ark'])", namespaces=ns
-        )
-        self.local_id = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='local'])", namespaces=ns
-        )
-        self.file_name = md.xpath(
-            "string(/mods:mods/mods:identifier[not(@*)])", namespaces=ns
-        )
-        self.uid = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='uid'])", namespaces=ns
-        )
-        self.avian_id = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='avian-id'])", namespaces=ns
-        )
-        self.project_number = md.xpath(
-            "string(/mods:mods/mods:identifier[@type='project-number'])", namespaces=ns
-        )
-        self.date_created = md.xpath(
-            "string(/mods:mods/mods:recordInfo/mods:recordCreationDate)", namespaces=ns
-        )
-        self.date_modified = md.xpath(
-            "string(/mods:mods/mods:recordInfo/mods:recordChangeDate)", namespaces=ns
-        )
-        self.issuance = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:issuance)", namespaces=ns
-        )
-        self.issuance_start = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:dateIssued[@point='start'])",
-            namespaces=ns,
-        )
-        self.issuance_end = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:dateIssued[@point='end'])",
-            namespaces=ns,
-        )
-        self.frequency = md.xpath(
-            "string(/mods:mods/mods:originInfo/mods:frequency)", namespaces=ns
-        )
-        self.digital_collection = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='host']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.digital_collection_ark = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type='host']/mods:identifier[@type='ark'])",
-            namespaces=ns,
-        )
-        self.related_exhibit = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type = 'isReferencedBy']/mods:titleInfo/mods:title)",
-            namespaces=ns,
-        )
-        self.related_exhibit_url = md.xpath(
-            "string(/mods:mods/mods:relatedItem[@type = 'isReferencedBy']/mods:identifier)",
-            namespaces=ns,
-        )
-        self.hardware_software = md.xpath(
-            "string(/mods:mods/mods:note[@type='hardware/software'])", namespaces=ns
-        )
-        self.disclaimer = md.xpath(
-            "string(/mods:mods/mods:note[@type='Disclaimer'])",
-            namespaces=ns,
-        )
-        self.image_manipulation = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='image-manipulation'])",
-            namespaces=ns,
-        )
-        self.file_size = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='file-size'])",
-            namespaces=ns,
-        )
-        self.resolution = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='resolution'])",
-            namespaces=ns,
-        )
-        self.colorspace = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='colorspace'])",
-            namespaces=ns,
-        )
-        self.bits_per_sample = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='bits-per-sample'])",
-            namespaces=ns,
-        )
-        self.samples_per_pixel = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='samples-per-pixel'])",
-            namespaces=ns,
-        )
-        self.height = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='height'])",
-            namespaces=ns,
-        )
-        self.width = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:note[@type='width'])",
-            namespaces=ns,
-        )
-        self.digital_origin = md.xpath(
-            "string(/mods:mods/mods:physicalDescription/mods:digitalOrigin)",
-            namespaces=ns,
-        )
+    __slots__ = tuple(HEADERS)
+
+    def __init__(self, md, engine="xpath", field_stats=None, xpaths=None):
+        # xpaths (see column_xpaths) restricts extraction to some columns;
+        # the rest are left empty. It always uses the xpath engine, since
+        # the tree walk can only extract everything.
+        if xpaths is None:
+            if engine == "walk" and field_stats is None:
+                first, many = treewalk.extract(md)
+                for name, _, joined in FIELDS:
+                    if joined:
+                        setattr(self, name, "; ".join(many.get(name, ())))
+                    else:
+                        setattr(self, name, first.get(name, ""))
+                return
+            xpaths = XPATHS
+        else:
+            for name in HEADERS:
+                setattr(self, name, "")
+
+        if field_stats is not None:
+            field_stats.extract(self, md, xpaths)
+            return
+
+        for name, xpath, joined in xpaths:
+            value = xpath(md)
+            setattr(self, name, "; ".join(value) if joined else value)
 
     def to_row(self):
-        return [
-            self.pid,
-            self.title,
-            self.archival_call_number,
-            self.archival_collection,
-            self.finding_aid_ark,
-            self.physical_location,
-            self.archival_series_title,
-            self.folder_title,
-            self.box,
-            self.folder,
-            self.contributing_institution,
-            self.contributing_institution_valueURI,
-            self.personal_creator,
-            self.personal_creator_valueURI,
-            self.corporate_creator,
-            self.corporate_creator_valueURI,
-            self.interviewee,
-            self.interviewee_valueURI,
-            self.interviewer,
-            self.interviewer_valueURI,
-            self.personal_contributor,
-            self.personal_contributor_valueURI,
-            self.corporate_contributor,
-            self.corporate_contributor_valueURI,
-            self.description,
-            self.table_of_contents,
-            self.annotation,
-            self.url,
-            self.language,
-            self.topical_subject_fast,
-            self.topical_subject_fast_valueURI,
-            self.geographic_subject_fast,
-            self.geographic_subject_fast_valueURI,
-            self.topical_subject_lcsh,
-            self.topical_subject_lcsh_valueURI,
-            self.topical_subject_local,
-            self.topical_subject_local_valueURI,
-            self.geographic_subject_lcsh,
-            self.geographic_subject_lcsh_valueURI,
-            self.geographic_subject_local,
-            self.geographic_subject_local_valueURI,
-            self.geographic_subject_geonames,
-            self.geographic_subject_geonames_valueURI,
-            self.coordinates,
-            self.personal_name_subject,
-            self.personal_name_subject_valueURI,
-            self.corporate_name_subject,
-            self.corporate_name_subject_valueURI,
-            self.birds_subject,
-            self.birds_subject_valueURI,
-            self.chronological_subject,
-            self.event_subject,
-            self.event_subject_valueURI,
-            self.extent,
-            self.aat_type,
-            self.aat_type_valueURI,
-            self.aat_genre,
-            self.aat_genre_valueURI,
-            self.dcmi_type,
-            self.dcmi_type_valueURI,
-            self.type_of_resource,
-            self.imt_type,
-            self.cco_description,
-            self.rights_management,
-            self.rights_management_valueURI,
-            self.date_original,
-            self.date_digital,
-            self.location_interview,
-            self.publisher,
-            self.publisher_valueURI,
-            self.ark,
-            self.local_id,
-            self.file_name,
-            self.uid,
-            self.avian_id,
-            self.project_number,
-            self.date_created,
-            self.date_modified,
-            self.issuance,
-            self.issuance_start,
-            self.issuance_end,
-            self.frequency,
-            self.digital_collection,
-            self.digital_collection_ark,
-            self.related_exhibit,
-            self.related_exhibit_url,
-            self.hardware_software,
-            self.image_manipulation,
-            self.file_size,
-            self.resolution,
-            self.colorspace,
-            self.bits_per_sample,
-            self.samples_per_pixel,
-            self.height,
-            self.width,
-            self.digital_origin,
-        ]
+        return list(ROW(self))
@@ -0,0 +1,81 @@
+from pathlib import Path
+import sys
+
+from lxml import etree
+import pytest
+
+from isa import xml2csv as x2c
+
+TEST_DATA = Path(__file__).parent / "test_data"
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+from corpus import mods_records  # noqa: E402
+
+MODS_NS = "http://www.loc.gov/mods/v3"
+
+
+def _fixture():
+    return etree.parse(str(TEST_DATA / "test.xml"))
+
+
+def _reparse(tree):
+    # So the trees look like parsed files.
+    return etree.ElementTree(etree.fromstring(etree.tostring(tree)))
+
+
+def _with_comments(tree):
+    # A comment before every element's first child, and one splitting the
+    # text of every leaf.
+    for el in list(tree.iter(etree.Element)):
+        if len(el):
+            el.insert(0, etree.Comment(" before "))
+        elif el.text:
+            half = len(el.text) // 2
+            comment = etree.Comment(" inside ")
+            comment.tail = el.text[half:]
+            el.text = el.text[:half]
+            el.append(comment)
+    return _reparse(tree)
+
+
+def _with_mixed_content(tree):
+    # Part of every leaf's text moved into a child element.
+    for el in list(tree.iter(etree.Element)):
+        if not len(el) and el.text and len(el.text) > 2:
+            child = etree.SubElement(el, f"{{{MODS_NS}}}span")
+            child.text = el.text[1:-1]
+            child.tail = el.text[-1]
+            el.text = el.text[0]
+    return _reparse(tree)
+
+
+def _assert_same_rows(md):
+    expected = x2c.XmlMD(md, "xpath").to_row()
+    actual = x2c.XmlMD(md, "walk").to_row()
+    mismatched = [
+        (name, e, a)
+        for (name, _, _), e, a in zip(x2c.FIELDS, expected, actual)
+        if e != a
+    ]
+    assert mismatched == []
+
+
+def test_fixture():
+    _assert_same_rows(_fixture())
+
+
+def test_fixture_with_comments():
+    _assert_same_rows(_with_comments(_fixture()))
+
+
+def test_fixture_with_mixed_content():
+    _assert_same_rows(_with_mixed_content(_fixture()))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_corpus(seed):
+    for _, mods in mods_records(100, seed, compound_every=10):
+        tree = etree.ElementTree(mods)
+        _assert_same_rows(_reparse(tree))
+        _assert_same_rows(_with_comments(_reparse(tree)))
+        _assert_same_rows(_with_mixed_content(_reparse(tree)))
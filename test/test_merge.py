@@ -0,0 +1,56 @@
+from pathlib import Path
+import shutil
+
+from lxml import etree
+import pytest
+
+from isa import csv2xml as c2x
+from isa import merge
+from isa import xml2csv as x2c
+
+TEST_DATA = Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def row():
+    values = x2c.XmlMD(etree.parse(str(TEST_DATA / "test.xml"))).to_row()
+    return dict(zip(x2c.HEADERS, values))
+
+
+@pytest.fixture
+def existing(tmp_path, row):
+    path = tmp_path / c2x.xml_file_name(row["pid"], "mods")
+    shutil.copy(TEST_DATA / "test.xml", path)
+    return path
+
+
+def _split(path, owned):
+    # c14n of the record's top-level elements the group owns, and of the rest.
+    record = etree.parse(str(path), merge.PARSER).getroot()
+    mine = owned(record)
+    return [_c14n(el) for el in mine], [_c14n(el) for el in record if el not in mine]
+
+
+def _c14n(el):
+    return etree.tostring(el, method="c14n", exclusive=True, with_tail=False)
+
+
+def test_unchanged_row_leaves_file_alone(tmp_path, row, existing):
+    before = existing.read_bytes()
+    assert merge.save_xml_merged([row], tmp_path) == (0, 0, 1)
+    assert existing.read_bytes() == before
+
+
+@pytest.mark.parametrize("column", ["title", "description"])
+def test_edit_rebuilds_only_its_group(tmp_path, row, existing, column):
+    owned = next(owned for _, columns, owned in merge.GROUPS if column in columns)
+    mine, rest = _split(existing, owned)
+
+    row[column] = "Edited value"
+    assert merge.save_xml_merged([row], tmp_path) == (0, 1, 0)
+
+    new_mine, new_rest = _split(existing, owned)
+    assert new_rest == rest
+    assert new_mine != mine
+    record = etree.parse(str(existing))
+    assert getattr(x2c.XmlMD(record), column) == "Edited value"
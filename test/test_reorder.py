@@ -0,0 +1,91 @@
+from pathlib import Path
+import random
+
+from lxml.etree import parse
+import pytest
+
+from isa import xml2csv as x2c
+
+TEST_DATA = Path(__file__).parent / "test_data"
+
+LOCAL_ID = x2c.LOCAL_ID
+FILE_NAME = x2c.FILE_NAME
+
+
+def legacy_reorder(rows):
+    # reorder_compound_objects as it was before it was made linear-time.
+    last_compound = 0
+    for i, row in enumerate(rows):
+        if not (row[FILE_NAME]):
+            local_id = row[LOCAL_ID].strip()
+            parent_row = row
+            for r in rows[last_compound:i]:
+                keys = (r[LOCAL_ID].strip(), r[FILE_NAME].split(".")[0].strip())
+                if local_id in keys:
+                    rows = (
+                        rows[: rows.index(r)]
+                        + [parent_row]
+                        + rows[rows.index(r) : i]
+                        + rows[i + 1 :]
+                    )
+                    break
+
+            last_compound = i
+
+    return rows
+
+
+def _row(i, local_id, file_name, base=None):
+    row = list(base) if base else [""] * len(x2c.HEADERS)
+    row[0] = f"isu:{i}"
+    row[LOCAL_ID] = local_id
+    row[FILE_NAME] = file_name
+    return row
+
+
+@pytest.fixture
+def fixture_row():
+    return x2c.XmlMD(parse(str(TEST_DATA / "test.xml"))).to_row()
+
+
+def test_fixture_row_columns(fixture_row):
+    assert len(fixture_row) == len(x2c.HEADERS)
+    assert fixture_row[LOCAL_ID] == "RS008-006-053_AV005248"
+    assert fixture_row[FILE_NAME] == "file_name.tif"
+
+
+def test_parent_moves_before_its_pages(fixture_row):
+    local_id = fixture_row[LOCAL_ID]
+    single = _row(0, "RS-single", "RS-single.tif", fixture_row)
+    pages = [_row(i, local_id, f"{local_id}_{i}.tif", fixture_row) for i in range(1, 4)]
+    parent = _row(4, local_id, "", fixture_row)
+    rows = [single] + pages + [parent]
+
+    expected = [single, parent] + pages
+    assert legacy_reorder(list(rows)) == expected
+    assert x2c.reorder_compound_objects(list(rows)) == expected
+    assert list(x2c.iter_reordered(iter(rows))) == expected
+
+
+def test_unmatched_parent_stays(fixture_row):
+    rows = [fixture_row, _row(1, "RS-other", "", fixture_row)]
+    assert x2c.reorder_compound_objects(list(rows)) == rows
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_legacy(seed):
+    # Small random exports, including keys that collide across objects and
+    # stray whitespace around local_ids.
+    rng = random.Random(seed)
+    for _ in range(500):
+        rows = [
+            _row(
+                i,
+                rng.choice(["", "a", "b", " a "]),
+                rng.choice(["", "a.tif", "b.jpg", "c"]),
+            )
+            for i in range(rng.randint(0, 40))
+        ]
+        expected = legacy_reorder(list(rows))
+        assert x2c.reorder_compound_objects(list(rows)) == expected
+        assert list(x2c.iter_reordered(iter(rows))) == expected
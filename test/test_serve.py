@@ -0,0 +1,103 @@
+from functools import partial
+import http.client
+import json
+from pathlib import Path
+import socket
+import threading
+
+from lxml import etree
+import pytest
+
+from isa import csv2xml as c2x
+from isa import serve
+from isa import xml2csv as x2c
+
+TEST_DATA = Path(__file__).parent / "test_data"
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def connect(request, tmp_path):
+    # A function returning a new connection to a running server.
+    if request.param == "tcp":
+        server = serve.make_server(("127.0.0.1", 0))
+        address = server.server_address[:2]
+        factory = partial(http.client.HTTPConnection, *address, timeout=10)
+    else:
+        socket_path = str(tmp_path / "isa.sock")
+        server = serve.make_server(socket_path=socket_path)
+        factory = partial(UnixHTTPConnection, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield factory
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def record():
+    return (TEST_DATA / "test.xml").read_bytes()
+
+
+@pytest.fixture
+def row(record):
+    md = x2c.XmlMD(etree.parse(str(TEST_DATA / "test.xml")))
+    return dict(zip(x2c.HEADERS, md.to_row()))
+
+
+def _post(conn, path, body):
+    conn.request("POST", path, body)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def test_mods_row(connect, record, row):
+    conn = connect()
+    status, data = _post(conn, "/mods/row", record)
+    assert status == 200
+    assert json.loads(data) == row
+
+    # The connection stays open for the next request.
+    status, data = _post(conn, "/mods/row?columns=pid,title", record)
+    assert status == 200
+    assert json.loads(data) == {"pid": row["pid"], "title": row["title"]}
+    conn.close()
+
+
+def test_rows_mods(connect, row):
+    conn = connect()
+    status, data = _post(conn, "/rows/mods", json.dumps([row, "not a row"]).encode("utf8"))
+    assert status == 200
+    mods, error = json.loads(data)
+    assert mods == c2x.serialize(c2x.CsvRow(row).to_mods()).decode("utf8")
+    assert "error" in error
+    conn.close()
+
+
+def test_malformed_xml(connect, record):
+    conn = connect()
+    status, data = _post(conn, "/mods/row", record[:200])
+    assert status == 400
+    assert "error" in json.loads(data)
+    conn.close()
+
+
+def test_no_content_length(connect):
+    conn = connect()
+    conn.putrequest("POST", "/mods/row")
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 411
+    assert response.getheader("Connection") == "close"
+    assert "error" in json.loads(response.read())
+    conn.close()
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+
+from isa import csv2xml as c2x
+from isa import xml2csv as x2c
+
+PIDS = [
+    "isu:Lectures_AVa",
+    "isu:Books_b",
+    "isu:Maps_c",
+    "isu:Pamph_d",
+    "isu:Photos_e",
+    "isu:Films_f",
+    "isu:12",
+    "isu:3",
+]
+
+
+def _write(folder, generate_dc, shard):
+    folder.mkdir()
+    mds = [{"pid": pid, "title": pid} for pid in PIDS]
+    if shard is None:
+        c2x.save_xml_stream(mds, folder, generate_dc)
+        return
+    layout = c2x.ShardLayout(folder, shard, size=3, generate_dc=generate_dc)
+    c2x.save_xml_stream(mds, folder, generate_dc, layout=layout)
+    layout.close()
+
+
+@pytest.mark.parametrize("generate_dc", [False, True])
+@pytest.mark.parametrize("shard", ["hash", "count"])
+def test_sharded_order_matches_flat(tmp_path, generate_dc, shard):
+    _write(tmp_path / "flat", generate_dc, None)
+    _write(tmp_path / "sharded", generate_dc, shard)
+
+    flat = x2c.xml_paths(tmp_path / "flat")
+    sharded = x2c.xml_paths(tmp_path / "sharded", recursive=True)
+    assert [x.parent.name for x in sharded] != ["sharded"] * len(sharded)
+    assert [x.name for x in sharded] == [x.name for x in flat]
+
+
+def test_numbered_files_sort_numerically():
+    paths = [Path(name) for name in ["isu_10.xml", "isu_9.xml", "b.xml", "a.xml"]]
+    names = [x.name for x in x2c.sort_xml_paths(paths)]
+    assert names == ["a.xml", "b.xml", "isu_9.xml", "isu_10.xml"]